@@ -0,0 +1,249 @@
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+import history
+import layouts
+from layouts import STAT_FIELDS
+
+FIELD_INDEX = {field: i for i, field in enumerate(STAT_FIELDS)}
+
+# Bonus stars whose effect on the winner is reported, with the stat deciding who gets them
+BONUS_STARS = {"minigame": "mg", "happening": "happening"}
+
+# Per session columns, as read from the database and kept in the cache
+COLUMNS = ("ids", "game_ids", "final_turn", "ended", "characters", "stats", "recorded")
+
+
+def database_id(connection):
+    """When the first session of the database started, which tells a recreated database from the cached one."""
+    row = connection.execute("SELECT started FROM sessions ORDER BY id LIMIT 1").fetchone()
+    return row[0] if row else None
+
+
+def query_sessions(connection, after=0, pending=()):
+    """Read the sessions with an id above after or in pending into the columns HistoryArrays is built from."""
+    import numpy
+
+    def matching(column):
+        if not pending:
+            return f"{column} > ?"
+        return f"({column} > ? OR {column} IN ({', '.join('?' * len(pending))}))"
+
+    parameters = (after, *pending)
+    sessions = connection.execute(f"SELECT id, game_id, final_turn, ended IS NOT NULL FROM sessions "
+                                  f"WHERE {matching('id')} ORDER BY id", parameters).fetchall()
+    picks = connection.execute(f"SELECT session_id, player, character FROM characters "
+                               f"WHERE {matching('session_id')}", parameters).fetchall()
+    rows = numpy.array(connection.execute(f"SELECT session_id, turn, player, {', '.join(STAT_FIELDS)} "
+                                          f"FROM player_stats WHERE {matching('session_id')}",
+                                          parameters).fetchall(),
+                       dtype=numpy.int64).reshape(-1, 3 + len(STAT_FIELDS))
+
+    ids = numpy.array([row[0] for row in sessions], dtype=numpy.int64)
+    characters = numpy.full((len(ids), 4), "", dtype=object)
+    for session_id, player, character in picks:
+        characters[numpy.searchsorted(ids, session_id), player] = character
+    final_turn = numpy.array([row[2] for row in sessions], dtype=numpy.int32)
+    turns = int(max(final_turn.max(initial=0), rows[:, 1].max(initial=0)))
+    session = numpy.searchsorted(ids, rows[:, 0])
+    turn = rows[:, 1] - 1
+    stats = numpy.zeros((len(ids), turns, 4, len(STAT_FIELDS)), dtype=numpy.int32)
+    stats[session, turn, rows[:, 2]] = rows[:, 3:]
+    recorded = numpy.zeros((len(ids), turns), dtype=bool)
+    recorded[session, turn] = True
+    return {
+        "ids": ids,
+        "game_ids": numpy.array([row[1] for row in sessions], dtype=str).reshape(-1),
+        "final_turn": final_turn,
+        "ended": numpy.array([row[3] for row in sessions], dtype=bool),
+        "characters": characters.astype(str),
+        "stats": stats,
+        "recorded": recorded
+    }
+
+
+def concatenate(first, second):
+    """Join two sets of session columns, padding the turn axis of the shorter one."""
+    import numpy
+
+    turns = max(first["recorded"].shape[1], second["recorded"].shape[1])
+    joined = {}
+    for name in COLUMNS:
+        parts = [first[name], second[name]]
+        if name in ("stats", "recorded"):
+            parts = [numpy.pad(part, [(0, 0), (0, turns - part.shape[1])] + [(0, 0)] * (part.ndim - 2))
+                     for part in parts]
+        joined[name] = numpy.concatenate(parts)
+    # Sessions that were still open when the cache was written come back in between the cached ones
+    order = numpy.argsort(joined["ids"], kind="stable")
+    return {name: column[order] for name, column in joined.items()}
+
+
+class HistoryArrays:
+    """Match history loaded into columnar NumPy arrays.
+
+    stats has shape (sessions, turns, 4, len(STAT_FIELDS)) and is indexed by (session, turn - 1, player,
+    field); recorded marks the (session, turn) cells that hold data. Per session there is game (an index into
+    games), final_turn, last_turn (the last recorded turn) and characters, an index into character_names for
+    each player. NumPy is imported on use, so the scanner itself never needs it.
+
+    Reading hundreds of thousands of stat rows out of SQLite takes seconds, so load() keeps the columns of
+    ended sessions in an .npz file next to the database. Only sessions newer than the cache and the ones that
+    were still open when it was written are queried again. The cache also holds when the database's first
+    session started, and is thrown away when that doesn't match, e.g. after the database was recreated.
+    """
+
+    def __init__(self, ids, game_ids, final_turn, ended, characters, stats, recorded):
+        import numpy
+
+        self.ids = ids
+        self.games, self.game = numpy.unique(game_ids, return_inverse=True)
+        self.final_turn = final_turn
+        self.ended = ended
+        names, codes = numpy.unique(characters, return_inverse=True)
+        # Players without a recorded pick are "", which sorts first and becomes -1
+        missing = len(names) > 0 and names[0] == ""
+        self.character_names = names[1:] if missing else names
+        self.characters = codes.reshape(characters.shape) - int(missing)
+        self.stats = stats
+        self.recorded = recorded
+        # Index of the last recorded turn of every session, -1 for sessions without any
+        self.last_turn = (recorded * numpy.arange(1, recorded.shape[1] + 1)).max(axis=1, initial=0) - 1
+
+    @classmethod
+    def load(cls, path=history.DEFAULT_PATH, cache=True):
+        import numpy
+
+        cache_path = os.path.splitext(path)[0] + ".npz"
+        connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            database = database_id(connection)
+            cached = None
+            if cache and os.path.exists(cache_path):
+                try:
+                    with numpy.load(cache_path) as data:
+                        if data["database"].item() == database:
+                            cached = {name: data[name] for name in COLUMNS + ("pending",)}
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"Ignoring the unreadable cache {cache_path}: {e}")
+            if cached is not None:
+                after = int(max(cached["ids"].max(initial=0), cached["pending"].max(initial=0)))
+                columns = concatenate(cached, query_sessions(connection, after, cached["pending"].tolist()))
+            else:
+                columns = query_sessions(connection)
+        finally:
+            connection.close()
+
+        # Ended sessions won't change anymore, so the cache holds those and remembers the others as pending
+        ended = columns["ended"]
+        if cache and ended.sum() > (len(cached["ids"]) if cached is not None else 0):
+            temp_path = cache_path + ".tmp"
+            with open(temp_path, "wb") as f:
+                numpy.savez(f, database=numpy.array(database), pending=columns["ids"][~ended],
+                            **{name: columns[name][ended] for name in COLUMNS})
+            os.replace(temp_path, cache_path)
+        return cls(**columns)
+
+    def completed(self):
+        """Mask of the sessions that were played up to their final turn."""
+        return self.ended & (self.last_turn == self.final_turn - 1)
+
+    def final_stats(self):
+        """Stats at the last recorded turn of every session, shape (sessions, 4, fields)."""
+        import numpy
+
+        return self.stats[numpy.arange(len(self.last_turn)), numpy.maximum(self.last_turn, 0)]
+
+    def average_by_character(self, field="stars"):
+        """Average final value of field per (game, character). Pairs that never occur are NaN."""
+        import numpy
+
+        mask = self.completed()[:, None] & (self.characters >= 0)
+        groups = len(self.games) * len(self.character_names)
+        keys = (self.game[:, None] * len(self.character_names) + self.characters)[mask]
+        values = self.final_stats()[..., FIELD_INDEX[field]][mask]
+        sums = numpy.bincount(keys, weights=values, minlength=groups)
+        counts = numpy.bincount(keys, minlength=groups)
+        with numpy.errstate(invalid="ignore", divide="ignore"):
+            return (sums / counts).reshape(len(self.games), len(self.character_names))
+
+    def curve_by_turn(self, field="coins"):
+        """Average value of field per (game, turn) over every player of every session."""
+        import numpy
+
+        turns = self.recorded.shape[1]
+        keys = (self.game[:, None] * turns + numpy.arange(turns))[self.recorded]
+        values = self.stats[..., FIELD_INDEX[field]].sum(axis=2)[self.recorded]
+        sums = numpy.bincount(keys, weights=values, minlength=len(self.games) * turns)
+        counts = numpy.bincount(keys, minlength=len(self.games) * turns) * 4
+        with numpy.errstate(invalid="ignore", divide="ignore"):
+            return (sums / counts).reshape(len(self.games), turns)
+
+    def bonus_decides_winner(self, field):
+        """Share of completed sessions per game where the bonus star awarded for field changes the winner.
+
+        The bonus star goes to every player tied for the highest non-zero value of field. Winners are ranked
+        by stars, then coins. Games without field are NaN.
+        """
+        import numpy
+
+        completed = self.completed()
+        final = self.final_stats()[completed]
+        game = self.game[completed]
+        score = final[..., FIELD_INDEX["stars"]] * 1000 + final[..., FIELD_INDEX["coins"]]
+        values = final[..., FIELD_INDEX[field]]
+        best = values.max(axis=1, keepdims=True)
+        bonus = (values == best) & (best > 0)
+        changed = numpy.argmax(score, axis=1) != numpy.argmax(score + bonus * 1000, axis=1)
+        counts = numpy.bincount(game, minlength=len(self.games))
+        with numpy.errstate(invalid="ignore", divide="ignore"):
+            shares = numpy.bincount(game, weights=changed, minlength=len(self.games)) / counts
+        for g, game_id in enumerate(self.games):
+            layout = layouts.get_layout(game_id)
+            if layout is None or field not in layout.stat_fields:
+                shares[g] = numpy.nan
+        return shares
+
+
+def report(arrays, out=sys.stdout):
+    completed = arrays.completed()
+    out.write(f"{len(arrays.game)} sessions, {int(completed.sum())} played to the final turn\n")
+    stars = arrays.average_by_character("stars")
+    coins = arrays.curve_by_turn("coins")
+    bonus = {name: arrays.bonus_decides_winner(field) for name, field in BONUS_STARS.items()}
+    for g, game_id in enumerate(arrays.games):
+        out.write(f"\n{game_id} ({int(completed[arrays.game == g].sum())} completed)\n")
+        out.write("  Average stars by character\n")
+        for c in stars[g].argsort()[::-1]:
+            if stars[g, c] == stars[g, c]:  # Skip characters nobody played
+                out.write(f"    {arrays.character_names[c]:<12} {stars[g, c]:5.2f}\n")
+        turns = [(t, value) for t, value in enumerate(coins[g]) if value == value]
+        out.write("  Average coins by turn\n    " + "  ".join(f"{t + 1}:{value:.1f}" for t, value in turns) + "\n")
+        out.write("  Bonus star decides the winner\n")
+        for name, share in bonus.items():
+            if share[g] == share[g]:
+                out.write(f"    {name:<12} {share[g] * 100:5.1f}%\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report statistics over the recorded match history.")
+    parser.add_argument("--database", default=history.DEFAULT_PATH, help="history database to read")
+    parser.add_argument("--no-cache", action="store_true", help="read every session from the database")
+    args = parser.parse_args(argv)
+    try:
+        start = time.perf_counter()
+        arrays = HistoryArrays.load(args.database, cache=not args.no_cache)
+        loaded = time.perf_counter()
+        report(arrays)
+    except ImportError:
+        parser.exit(1, "The report needs NumPy: pip install numpy\n")
+    except sqlite3.OperationalError as e:
+        parser.exit(1, f"Can't read {args.database}: {e}\n")
+    print(f"\nLoaded in {(loaded - start) * 1000:.0f} ms, computed in {(time.perf_counter() - loaded) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+import time
+import customtkinter
+import os
+import json
+import threading
+import images
+import instrumentation
+import layouts
+import memory
+import output
+import planner
+import poller
+import render
+import scheduler
+
+def read_config(path="config.json"):
+    """Parse config.json into the App attributes it sets. Returns None, after printing why, if it can't be used."""
+    try:
+        with open(path, "r") as file:
+            data = json.load(file)
+        if not isinstance(data, dict) or "names" not in data:
+            print("config.json is not a valid JSON object or missing 'names' key.")
+            return None
+        window_size = data["windowSize"]
+        return {
+            "name_overrides": data["names"],
+            "player_icon_size": int(data["playerIconSize"]),
+            "stats_label_size": int(data["statsLabelSize"]),
+            "turn_label_size": int(data["turnLabelSize"]),
+            "bg_color": data["bgColor"],
+            "poll_interval": int(data.get("pollInterval", 20)),
+            "board_poll_interval": int(data.get("boardPollInterval", 100)),
+            "idle_poll_interval": int(data.get("idlePollInterval", 500)),
+            "read_gap": int(data.get("readGap", 256)),
+            "frame_interval": int(data.get("frameInterval", 20)),
+            "state_json": bool(data.get("stateJson", False)),
+            "debug_overlay": bool(data.get("debugOverlay", False)),
+            "server_enabled": bool(data.get("server", False)),
+            "server_port": int(data.get("serverPort", 8765)),
+            "history_enabled": bool(data.get("history", False)),
+            "shared_memory_enabled": bool(data.get("sharedMemory", False)),
+            "window_width": window_size["width"],
+            "window_height": window_size["height"]
+        }
+    except FileNotFoundError:
+        print("config.json file not found.")
+    except json.JSONDecodeError:
+        print("Error decoding config.json.")
+    except KeyError as e:
+        print(f"Missing key in config.json: {e}")
+    return None
+
+# Asset names of character portraits and stat icons, to drop just those from the image cache when a size changes
+PORTRAIT_NAMES = frozenset(name for layout in layouts.LAYOUTS.values() for name in layout.character_names)
+ICON_NAMES = frozenset(name for layout in layouts.LAYOUTS.values() for name in layout.icons.values())
+
+class ConfigFileHandler:
+    """Reloads config.json when it changes and hands the parsed config to the UI thread.
+
+    Editors often fire several events per save, so the file is only read once no event arrived for delay
+    seconds. watchdog is only imported once monitoring starts, so this implements the FileSystemEventHandler
+    interface itself rather than subclassing it.
+    """
+
+    def __init__(self, app, delay=0.25):
+        self.app = app
+        self.delay = delay
+        self.timer = None
+        self.lock = threading.Lock()
+
+    def dispatch(self, event):
+        # Editors that save through a temporary file end with a move onto config.json
+        path = getattr(event, "dest_path", "") if event.event_type == "moved" else event.src_path
+        if event.event_type in ("modified", "created", "moved") and os.path.basename(path) == "config.json":
+            self.on_modified(event)
+
+    def on_modified(self, event):
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+            self.timer = threading.Timer(self.delay, self.reload)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def reload(self):
+        config = read_config()
+        if config is not None:
+            print("config.json has been updated. Reloading...")
+            self.app.config_updates.put(config)
+
+    def cancel(self):
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+
+class App(customtkinter.CTk):
+    def __init__(self, *args, backend=None, started=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.backend = backend or memory.default_backend
+        # time.perf_counter() at launch, to print the time to the first frame and quit
+        self.started = started
+
+        try:
+            os.mkdir("data")
+        except:
+            pass
+
+        self.title("Mario Party Scanner")
+ 
+
+        self.ensure_config_exists()
+        self.load_name_overrides()
+        customtkinter.set_appearance_mode("Dark")
+
+        self.geometry(f"{self.window_width - 30}x{self.window_height + 75}")
+
+        self.home_frame = customtkinter.CTkFrame(self, corner_radius=12, fg_color=(self.bg_color, self.bg_color), width=self.window_width / 2, height=self.window_height / 2)
+        self.home_frame.grid(row=0, column=0, padx=10, pady=10, sticky="nsew")
+
+        self.turn_label = customtkinter.CTkLabel(self.home_frame, text="", font=("Helvetica", self.turn_label_size, "bold"))
+        self.turn_label.grid(row=0, column=0, padx=10, pady=10, sticky="n")
+
+        # Configure grid columns to be evenly spaced
+        for i in range(4):
+            self.home_frame.grid_columnconfigure(i, weight=1)
+
+        # Image labels and character name labels
+        self.image_labels = []
+        self.name_labels = []
+
+        for i in range(4):
+            img_label = customtkinter.CTkLabel(self.home_frame, text="", width=150, height=self.player_icon_size + 5, corner_radius=8)
+            img_label.grid(row=1, column=i, padx=10, pady=5, sticky="nsew")
+            self.image_labels.append(img_label)
+
+            name_label = customtkinter.CTkLabel(self.home_frame, text="", font=("Helvetica", 24))
+            name_label.grid(row=2, column=i, padx=10, pady=5, sticky="nsew")
+            self.name_labels.append(name_label)
+
+        self.renderer = render.Renderer()
+        # Reloaded configs, parsed on the file monitoring thread and applied by refresh()
+        self.config_updates = poller.LatestQueue()
+        self.images = images.ImageCache()
+        self.overlay = output.OverlayWriter(state_file="state.json" if self.state_json else None)
+        self.view = render.SnapshotView(self.renderer, self.images, self.turn_label, self.image_labels,
+                                        self.name_labels, self.make_stat_labels, self.write_overlay,
+                                        self.name_overrides, self.player_icon_size, self.stats_label_size)
+        self.poller = poller.Poller(self.poll_interval / 1000, self.backend, self.board_poll_interval / 1000,
+                                    self.idle_poll_interval / 1000, fields=planner.FIELDS, read_gap=self.read_gap)
+        self.server = None
+        if self.server_enabled:
+            import server
+            self.server = server.SnapshotServer(port=self.server_port)
+            self.server.start()
+            self.poller.listen(self.server.publish)
+            import events
+            engine = events.EventEngine([self.server.publish_event])
+            self.poller.listen(engine.observe, engine.fields)
+        self.history = None
+        if self.history_enabled:
+            import history
+            self.history = history.History()
+            self.history.start()
+            self.poller.listen(self.history.observe, self.history.fields)
+        self.publisher = None
+        if self.shared_memory_enabled:
+            import sharedmem
+            self.publisher = sharedmem.SnapshotPublisher()
+            self.poller.listen(self.publisher.publish)
+        self.poller.start()
+        self.scheduler = scheduler.Scheduler(self)
+        self.scheduler.every("refresh", self.frame_interval, self.refresh)
+
+        # Per stage timings, toggled with F3 or the debugOverlay key in config.json
+        self.debug_label = customtkinter.CTkLabel(self, text="", font=("Courier", 12), justify="left", anchor="w")
+        self.bind("<F3>", lambda event: self.set_debug_overlay(not instrumentation.instrumentation.enabled))
+        self.set_debug_overlay(self.debug_overlay)
+
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        # Start file monitoring once the window is up, so importing watchdog doesn't delay the first frame
+        self.scheduler.once("file monitoring", 0, self.start_file_monitoring)
+
+    def refresh(self):
+        """Render the newest snapshot from the poller, if one arrived since the last frame."""
+        config = self.config_updates.get_latest()
+        if config is not None:
+            self.apply_config(config)
+
+        snapshot = self.poller.snapshots.get_latest()
+        if snapshot is None:
+            return
+        with instrumentation.span("widget update"):
+            rendered = self.view.render(snapshot)
+        if rendered:
+            instrumentation.count("frame")
+            if self.started is not None:
+                self.report_startup()
+
+    def make_stat_labels(self, field):
+        return [customtkinter.CTkLabel(self.home_frame, text="", font=("Helvetica", self.stats_label_size))
+                for _ in range(4)]
+
+    def report_startup(self):
+        """Print how long it took from launch to the first rendered frame, then quit."""
+        self.update_idletasks()
+        started, self.started = self.started, None
+        print(f"First frame rendered {(time.perf_counter() - started) * 1000:.0f} ms after startup "
+              f"(game: {self.view.snapshot.game_id or 'none'}, connection: {self.view.snapshot.connection})")
+        self.after_idle(self.on_close)
+
+    def set_debug_overlay(self, enabled):
+        instrumentation.instrumentation.enable(enabled)
+        if enabled:
+            self.debug_label.grid(row=1, column=0, padx=10, pady=(0, 10), sticky="w")
+            self.scheduler.every("debug overlay", 500, self.update_debug_overlay)
+        else:
+            self.scheduler.cancel("debug overlay")
+            self.debug_label.grid_forget()
+
+    def update_debug_overlay(self):
+        self.debug_label.configure(text=instrumentation.instrumentation.summary())
+
+    def ensure_config_exists(self):
+        """Create a default config.json file if it doesn't exist."""
+        config_path = "config.json"
+        if not os.path.exists(config_path):
+            default_config = {
+                "names": {
+                    "mario": "",
+                    "luigi": "",
+                    "peach": "",
+                    "yoshi": "",
+                    "wario": "",
+                    "dk": "",
+                    "daisy": "",
+                    "waluigi": "",
+                    "boo": "",
+                    "koopakid": "",
+                    "toad": "",
+                    "toadette": "",
+                    "drybones": "",
+                    "birdo": "",
+                    "blooper": "",
+                    "hammerbro": ""
+                },
+                "playerIconSize": 150,
+                "statsLabelSize": 26,
+                "turnLabelSize": 32,
+                "bgColor": "#323232",
+                "pollInterval": 20,
+                "boardPollInterval": 100,
+                "idlePollInterval": 500,
+                "readGap": 256,
+                "frameInterval": 20,
+                "stateJson": False,
+                "debugOverlay": False,
+                "server": False,
+                "serverPort": 8765,
+                "history": False,
+                "sharedMemory": False,
+                "windowSize": {
+                    "width": 800,
+                    "height": 600
+                }
+            }
+            try:
+                with open(config_path, "w") as file:
+                    json.dump(default_config, file, indent=4)
+            except Exception as e:
+                print(f"Error creating config.json: {e}")
+
+    def load_name_overrides(self):
+        self.name_overrides = {}
+        config = read_config()
+        if config is not None:
+            for name, value in config.items():
+                setattr(self, name, value)
+
+    def apply_config(self, config):
+        """Apply the settings that differ between a reloaded config.json and the current ones."""
+        changes = {name: value for name, value in config.items() if getattr(self, name, None) != value}
+        previous = {name: getattr(self, name, None) for name in changes}
+        for name, value in changes.items():
+            setattr(self, name, value)
+
+        if "player_icon_size" in changes:
+            self.images.discard(previous["player_icon_size"], PORTRAIT_NAMES)
+            for img_label in self.image_labels:
+                self.renderer.configure(img_label, height=self.player_icon_size + 5)
+        if "stats_label_size" in changes:
+            self.images.discard(previous["stats_label_size"] + 2, ICON_NAMES)
+            for labels in self.view.stat_labels.values():
+                for label in labels:
+                    self.renderer.configure(label, font=("Helvetica", self.stats_label_size))
+        if "turn_label_size" in changes:
+            self.renderer.configure(self.turn_label, font=("Helvetica", self.turn_label_size, "bold"))
+        if "bg_color" in changes:
+            self.home_frame.configure(fg_color=(self.bg_color, self.bg_color))
+        if changes.keys() & {"window_width", "window_height"}:
+            self.geometry(f"{self.window_width - 30}x{self.window_height + 75}")
+        if changes.keys() & {"poll_interval", "board_poll_interval", "idle_poll_interval"}:
+            self.poller.interval = self.poll_interval / 1000
+            self.poller.board_interval = max(self.board_poll_interval, self.poll_interval) / 1000
+            self.poller.idle_interval = max(self.idle_poll_interval, self.poll_interval) / 1000
+        if "read_gap" in changes:
+            self.poller.planner = planner.ReadPlanner(self.read_gap)
+        if "frame_interval" in changes:
+            self.scheduler.every("refresh", self.frame_interval, self.refresh)
+        if "state_json" in changes:
+            self.overlay.state_file = "state.json" if self.state_json else None
+            self.overlay.state_pending = True
+        if "debug_overlay" in changes:
+            self.set_debug_overlay(self.debug_overlay)
+        if changes.keys() & {"server_enabled", "server_port", "history_enabled", "shared_memory_enabled"}:
+            print("Server, history and shared memory settings take effect after a restart.")
+
+        # Names and image sizes show up on a full render of the current snapshot
+        if changes.keys() & {"name_overrides", "player_icon_size", "stats_label_size"}:
+            self.view.name_overrides = self.name_overrides
+            self.view.player_icon_size = self.player_icon_size
+            self.view.stats_label_size = self.stats_label_size
+            self.view.invalidate()
+
+    def start_file_monitoring(self):
+        from watchdog.observers import Observer
+
+        self.config_handler = ConfigFileHandler(self)
+        self.observer = Observer()
+        self.observer.schedule(self.config_handler, path=os.path.dirname(os.path.abspath("config.json")), recursive=False)
+        self.observer.start()
+
+    def on_close(self):
+       self.scheduler.cancel_all()
+       self.poller.stop()
+       self.poller.join()
+       if self.server:
+           self.server.stop()
+       if self.history:
+           self.history.close()
+       if self.publisher:
+           self.publisher.close()
+       self.backend.close()
+       # Stop the observer if it exists
+       if hasattr(self, 'observer'):
+           self.observer.stop()
+           self.observer.join()
+           self.config_handler.cancel()
+       self.destroy()
+
+    def write_overlay(self, fields):
+        if self.overlay.update(fields) and not self.scheduler.is_pending("overlay flush"):
+            self.scheduler.once("overlay flush", self.overlay.flush_delay, self.flush_overlay)
+
+    def flush_overlay(self):
+        self.overlay.flush()
+        # Files another program held open are retried on the next flush
+        if self.overlay.pending:
+            self.scheduler.once("overlay flush", self.overlay.flush_delay, self.flush_overlay)
+
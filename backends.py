@@ -0,0 +1,255 @@
+import mmap
+import os
+import time
+from collections import namedtuple
+
+# pywin32 modules, imported by load_win32() the first time windows are looked at
+win32api = win32gui = win32process = None
+
+# A running Dolphin. DME finds the process to hook by its executable name, without the extension.
+Instance = namedtuple("Instance", ["pid", "process_name"])
+
+MEM1_ADDRESS = 0x80000000
+MEM1_SIZE = 0x1800000
+MEM2_ADDRESS = 0x90000000
+MEM2_SIZE = 0x4000000
+
+
+class MemoryBackend:
+    """Where game memory is read from. Subclasses implement hook, is_hooked, unhook and read."""
+
+    # True when memory only moves on when a poll ends, so the poller doesn't wait between polls
+    frame_driven = False
+    # True once there is nothing left to read, i.e. a replay played its last frame
+    finished = False
+
+    def hook(self):
+        """Try to attach to the emulator. Returns True once attached."""
+        raise NotImplementedError
+
+    def is_hooked(self):
+        raise NotImplementedError
+
+    def unhook(self):
+        raise NotImplementedError
+
+    def read(self, address, size):
+        """Return size bytes starting at address. Raises RuntimeError if memory can't be read."""
+        raise NotImplementedError
+
+    def read_many(self, requests):
+        """Read a list of (address, size) requests, returning the bytes of each."""
+        return [self.read(address, size) for address, size in requests]
+
+    def read_into(self, address, buffer):
+        """Fill buffer, a bytearray, with the bytes starting at address."""
+        buffer[:] = self.read(address, len(buffer))
+
+    def read_many_into(self, requests):
+        """Fill the buffer of every (address, buffer) request."""
+        for address, buffer in requests:
+            self.read_into(address, buffer)
+
+    def end_frame(self):
+        """Called by the poller after every poll."""
+
+    def close(self):
+        pass
+
+
+def load_win32():
+    """Import pywin32 on first use. Returns False where it isn't available."""
+    global win32api, win32gui, win32process
+    if win32gui is None:
+        try:
+            import win32api
+            import win32gui
+            import win32process
+        except ImportError:
+            return False
+    return True
+
+
+def window_enumeration_handler(hwnd, top_windows):
+    top_windows.append((hwnd, win32gui.GetWindowText(hwnd)))
+
+
+def find_window_by_substring(substring):
+    top_windows = []
+    win32gui.EnumWindows(window_enumeration_handler, top_windows)
+    for hwnd, window_text in top_windows:
+        if substring in window_text:
+            return hwnd, window_text
+    return None, None
+
+
+def check_emulator_window():
+    # Without win32gui there is no window list to check, so leave it to hook() to find Dolphin
+    if not load_win32():
+        return "Dolphin"
+    hwnd, window_text = find_window_by_substring("Dolphin MPN")
+    if hwnd:
+        os.environ["DME_DOLPHIN_PROCESS_NAME"] = "Dolphin-MPN"
+        return "Dolphin"
+    hwnd, window_text = find_window_by_substring("Dolphin")
+    if hwnd:
+        return "Dolphin"
+    return None
+
+
+def discover_instances():
+    """Return an Instance for every running Dolphin process."""
+    instances = {}
+    if load_win32():
+        top_windows = []
+        win32gui.EnumWindows(window_enumeration_handler, top_windows)
+        for hwnd, window_text in top_windows:
+            if "Dolphin" not in window_text:
+                continue
+            # Dolphin has a main and a render window, both belonging to the same process
+            pid = win32process.GetWindowThreadProcessId(hwnd)[1]
+            if pid in instances:
+                continue
+            try:
+                handle = win32api.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+                path = win32process.GetModuleFileNameEx(handle, 0)
+            except win32api.error:
+                continue
+            instances[pid] = Instance(pid, os.path.splitext(os.path.basename(path))[0])
+    elif os.path.isdir("/proc"):
+        for entry in os.listdir("/proc"):
+            try:
+                with open(f"/proc/{entry}/comm") as f:
+                    process_name = f.read().strip()
+            except (OSError, ValueError):
+                continue
+            if entry.isdigit() and "dolphin" in process_name.lower():
+                instances[int(entry)] = Instance(int(entry), process_name)
+    return sorted(instances.values())
+
+
+class DolphinBackend(MemoryBackend):
+    """Reads a running Dolphin through dolphin_memory_engine, which is imported on first use.
+
+    With process_name set, only the Dolphin running from that executable is hooked.
+    """
+
+    def __init__(self, process_name=None):
+        self.process_name = process_name
+        self.dme = None
+
+    def engine(self):
+        if self.dme is None:
+            import dolphin_memory_engine
+            self.dme = dolphin_memory_engine
+        return self.dme
+
+    def hook(self):
+        if self.process_name:
+            os.environ["DME_DOLPHIN_PROCESS_NAME"] = self.process_name
+        elif check_emulator_window() != "Dolphin":
+            return False
+        self.engine().hook()
+        return self.dme.is_hooked()
+
+    def is_hooked(self):
+        return self.engine().is_hooked()
+
+    def unhook(self):
+        self.engine().un_hook()
+
+    def read(self, address, size):
+        return self.engine().read_bytes(address, size)
+
+
+class FakeBackend(MemoryBackend):
+    """In-process stand-in for Dolphin serving emulated RAM from a bytearray or a memory-mapped dump.
+
+    latency seconds are slept on every call to simulate the cost of talking to the emulator. calls counts
+    backend calls, reads the memory regions they covered and bytes_read their total size. Like
+    DolphinBackend, read_many and read_many_into make one call per request, so calls is what Dolphin would
+    see.
+    """
+
+    def __init__(self, mem1=None, mem2=None, latency=0):
+        self.mem1 = mem1 if mem1 is not None else bytearray(MEM1_SIZE)
+        self.mem2 = mem2
+        self.latency = latency
+        self.hooked = False
+        self.files = []
+        self.reset_counters()
+
+    @classmethod
+    def from_dump(cls, mem1_path, mem2_path=None, latency=0):
+        """Serve memory dumps (e.g. Dolphin's mem1.raw and mem2.raw) without loading them into RAM."""
+        backend = cls(cls.map_file(mem1_path), None, latency)
+        backend.files.append(backend.mem1)
+        if mem2_path:
+            backend.mem2 = cls.map_file(mem2_path)
+            backend.files.append(backend.mem2)
+        return backend
+
+    @staticmethod
+    def map_file(path):
+        with open(path, "rb") as f:
+            # Copy on write, so tests can poke values without touching the dump
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    def close(self):
+        for mapped in self.files:
+            mapped.close()
+        self.files = []
+
+    def reset_counters(self):
+        self.calls = 0
+        self.reads = 0
+        self.bytes_read = 0
+
+    def region(self, address, size):
+        """Return the buffer holding address and the offset of address inside it."""
+        for start, buffer in ((MEM1_ADDRESS, self.mem1), (MEM2_ADDRESS, self.mem2)):
+            if buffer is not None and start <= address and address + size <= start + len(buffer):
+                return buffer, address - start
+        raise RuntimeError(f"Address {address:#x} is outside of emulated memory")
+
+    def hook(self):
+        self.hooked = True
+        return True
+
+    def is_hooked(self):
+        return self.hooked
+
+    def unhook(self):
+        self.hooked = False
+
+    def read(self, address, size):
+        self.call()
+        return self.read_region(address, size)
+
+    def read_into(self, address, buffer):
+        self.call()
+        self.copy_region(address, buffer)
+
+    def call(self):
+        if not self.hooked:
+            raise RuntimeError("Not hooked")
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def copy_region(self, address, buffer):
+        source, offset = self.region(address, len(buffer))
+        self.reads += 1
+        self.bytes_read += len(buffer)
+        buffer[:] = memoryview(source)[offset:offset + len(buffer)]
+
+    def read_region(self, address, size):
+        buffer, offset = self.region(address, size)
+        self.reads += 1
+        self.bytes_read += size
+        return bytes(buffer[offset:offset + size])
+
+    def write(self, address, data):
+        """Poke bytes into emulated memory."""
+        buffer, offset = self.region(address, len(data))
+        buffer[offset:offset + len(data)] = data
@@ -0,0 +1,239 @@
+import argparse
+import array
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+
+import backends
+import images
+import layouts
+import output
+import planner
+import poller
+import recorder
+import render
+
+GAME_IDS = ("GMPE01", "GMPEDX", "GP5E01", "GP6E01", "GP7E01", "RM8E01")
+
+
+class NullWidget:
+    """Stand-in for a Tk label that only counts what the renderer asks of it."""
+
+    def __init__(self, counter):
+        self.counter = counter
+
+    def configure(self, **options):
+        self.counter["widget_updates"] += 1
+
+    def grid(self, **options):
+        self.counter["widget_updates"] += 1
+
+    def grid_forget(self):
+        self.counter["widget_updates"] += 1
+
+
+class CountingImageCache(images.ImageCache):
+    """Image cache that counts decodes instead of building PhotoImages, which need a display."""
+
+    def __init__(self, counter):
+        super().__init__()
+        self.counter = counter
+
+    def load(self, folder, name, size):
+        self.counter["image_decodes"] += 1
+        return (folder, name, size)
+
+
+class Pipeline:
+    """The scanner's poll, decode, render and file output stages, with counting stand-ins for Tk.
+
+    Rendering goes through the window's own render.SnapshotView.
+    """
+
+    def __init__(self, backend, directory):
+        self.counter = defaultdict(int)
+        self.poller = poller.Poller(backend=backend, fields=planner.FIELDS)
+        self.renderer = render.Renderer()
+        self.images = CountingImageCache(self.counter)
+        self.overlay = output.OverlayWriter(directory)
+        self.view = render.SnapshotView(self.renderer, self.images, NullWidget(self.counter),
+                                        [NullWidget(self.counter) for _ in range(4)],
+                                        [NullWidget(self.counter) for _ in range(4)], self.make_stat_labels,
+                                        self.overlay.update)
+        self.ticks = 0
+
+    def make_stat_labels(self, field):
+        return [NullWidget(self.counter) for _ in range(4)]
+
+    def tick(self):
+        snapshot = self.poller.tick()
+        self.view.render(snapshot)
+        # The window flushes overlay files every 100 ms, every 5th tick at the default 20 ms poll rate
+        self.ticks += 1
+        if self.ticks % 5 == 0:
+            self.overlay.flush()
+
+
+def write_value(backend, address, width, value):
+    backend.write(address, (value % (1 << (8 * width))).to_bytes(width, "big"))
+
+
+def synthetic_backend(game_id, latency=0):
+    """Emulated memory of a board in progress: four players, turn 1 of 20, on the game's first board scene."""
+    layout = layouts.get_layout(game_id)
+    backend = backends.FakeBackend(latency=latency)
+    backend.write(0x80000000, game_id.encode())
+    write_value(backend, layout.data.scene, 1, min(layout.board_scenes))
+    write_value(backend, layout.data.turn, 1, 1)
+    write_value(backend, layout.data.final_turn, 1, 20)
+    for i in range(4):
+        write_value(backend, layout.data.characters + i * layout.data.character_stride, 1, i)
+    for (i, field), (address, width) in layout.stat_addresses.items():
+        write_value(backend, address, width, 10 + i)
+    return backend
+
+
+def simulate(backend, layout, tick):
+    """Change memory like a board game does: coins often, stars now and then, the turn rarely."""
+    player = tick % 4
+    if tick % 3 == 0:
+        address, width = layout.stat_addresses[player, "coins"]
+        write_value(backend, address, width, tick // 3)
+    if tick % 60 == 0:
+        address, width = layout.stat_addresses[player, "stars"]
+        write_value(backend, address, width, tick // 60)
+    if tick % 250 == 0:
+        write_value(backend, layout.data.turn, 1, 1 + tick // 250 % 20)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run(backend, ticks, warmup=50, allocation_ticks=200, simulate_game=None):
+    """Drive the pipeline for ticks ticks, or until a replay finishes if ticks is None, and return its metrics."""
+    with tempfile.TemporaryDirectory() as directory:
+        pipeline = Pipeline(backend, directory)
+        for tick in range(warmup):
+            pipeline.tick()
+
+        def step(tick):
+            if simulate_game:
+                simulate(backend, layouts.get_layout(simulate_game), tick)
+
+        pipeline.counter.clear()
+        if hasattr(backend, "reset_counters"):
+            backend.reset_counters()
+        # Raw integers rather than a list, so recording timings doesn't add a heap object per tick to the block count
+        durations = array.array("q")
+        blocks = sys.getallocatedblocks()
+        tick = 0
+        while tick < ticks if ticks is not None else not backend.finished:
+            step(tick)
+            start = time.perf_counter_ns()
+            pipeline.tick()
+            durations.append(time.perf_counter_ns() - start)
+            tick += 1
+        ticks = tick
+        net_blocks = sys.getallocatedblocks() - blocks
+        counter = dict(pipeline.counter)
+        calls, reads, bytes_read = backend.calls, backend.reads, backend.bytes_read
+
+        # Allocation tracing slows everything down, so it gets its own pass
+        peaks = []
+        tracemalloc.start()
+        for tick in range(ticks, ticks + allocation_ticks):
+            step(tick)
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            pipeline.tick()
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+        # Ticks where memory didn't change, the common case between moves
+        idle_peaks = []
+        for tick in range(allocation_ticks):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            pipeline.tick()
+            idle_peaks.append(tracemalloc.get_traced_memory()[1] - current)
+        tracemalloc.stop()
+
+    return {
+        "ticks": ticks,
+        "tick_p50_us": percentile(durations, 0.5) / 1000,
+        "tick_p99_us": percentile(durations, 0.99) / 1000,
+        "ticks_per_second": ticks / (sum(durations) / 1e9),
+        "backend_calls_per_tick": calls / ticks,
+        "backend_reads_per_tick": reads / ticks,
+        "bytes_read_per_tick": bytes_read / ticks,
+        "allocated_bytes_per_tick": statistics.mean(peaks) if peaks else None,
+        "unchanged_tick_allocated_bytes": statistics.mean(idle_peaks) if idle_peaks else None,
+        "net_allocated_blocks_per_tick": net_blocks / ticks,
+        "image_decodes_per_tick": counter.get("image_decodes", 0) / ticks,
+        "widget_updates_per_tick": counter.get("widget_updates", 0) / ticks
+    }
+
+
+def compare(results, baseline):
+    """Print how every metric moved against a previous run."""
+    for game_id, metrics in results["games"].items():
+        before = baseline.get("games", {}).get(game_id)
+        if not before:
+            continue
+        print(game_id)
+        for name, value in metrics.items():
+            old = before.get(name)
+            if isinstance(value, (int, float)) and isinstance(old, (int, float)):
+                change = f"{(value - old) / old * 100:+.1f}%" if old else "n/a"
+                print(f"  {name:32} {old:>12.2f} -> {value:>12.2f}  {change}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the scanner's poll/decode/render pipeline without an emulator.")
+    parser.add_argument("--ticks", type=int, default=2000, help="ticks to measure per game (default: 2000). Recordings are replayed in full.")
+    parser.add_argument("--games", nargs="+", default=GAME_IDS, choices=GAME_IDS, metavar="GAME_ID",
+                        help="game IDs to benchmark with synthetic memory (default: all)")
+    parser.add_argument("--recording", metavar="FILE", help="benchmark a recorded session instead of synthetic memory")
+    parser.add_argument("--latency", type=float, default=0, metavar="SECONDS",
+                        help="simulated latency of every emulator call")
+    parser.add_argument("--output", "-o", metavar="FILE", help="write the results as JSON to FILE")
+    parser.add_argument("--compare", metavar="FILE", help="compare against the JSON results of an earlier run")
+    args = parser.parse_args(argv)
+
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "latency": args.latency,
+        "games": {}
+    }
+    if args.recording:
+        backend = recorder.Replayer(args.recording, speed=None)
+        backend.latency = args.latency
+        # Every frame of the recording, through the same decode and render code as the window
+        results["games"]["recording"] = run(backend, None, warmup=0, allocation_ticks=0)
+        backend.close()
+    else:
+        for game_id in args.games:
+            results["games"][game_id] = run(synthetic_backend(game_id, args.latency), args.ticks,
+                                            simulate_game=game_id)
+
+    text = json.dumps(results, indent=4)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import time
+
+import instrumentation
+import memory
+
+DETACHED = "detached"
+HOOKING = "hooking"
+ATTACHED = "attached"
+GAME_DETECTED = "game detected"
+
+
+class ConnectionManager:
+    """Tracks the hook into Dolphin: detached -> hooking -> attached -> game detected.
+
+    Windows are only scanned and hook() only called while detached, and failed attempts back off
+    exponentially. Once attached it stays attached until a read fails.
+    """
+
+    def __init__(self, backend=None, min_backoff=0.5, max_backoff=10):
+        self.backend = backend or memory.default_backend
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.backoff = min_backoff
+        self.next_attempt = 0
+        self.state = DETACHED
+        self.game_id = None
+
+    def poll(self, context=None):
+        """Attach if needed and return the running game ID, or None.
+
+        The game ID can't change without the game restarting, which breaks the hook, so once a known game
+        is detected it is kept for the rest of the attach session.
+        """
+        if self.state == GAME_DETECTED:
+            return self.game_id
+
+        if self.state == DETACHED:
+            if time.monotonic() < self.next_attempt:
+                return None
+            with instrumentation.span("attach"):
+                attached = self.attach()
+            if not attached:
+                return None
+
+        with instrumentation.span("game id read"):
+            game_id = memory.read_game_id(context)
+        if game_id is None:
+            self.read_failed()
+            return None
+
+        self.game_id = game_id
+        self.state = GAME_DETECTED if memory.get_reader(game_id) else ATTACHED
+        return game_id
+
+    def attach(self):
+        self.state = HOOKING
+        if self.backend.hook():
+            self.state = ATTACHED
+            self.backoff = self.min_backoff
+            return True
+        self.retry_later()
+        return False
+
+    def read_failed(self):
+        """Drop the hook after a failed read, so the next attempt rescans for Dolphin."""
+        if self.backend.is_hooked():
+            self.backend.unhook()
+        self.retry_later()
+
+    def retry_later(self):
+        self.state = DETACHED
+        self.game_id = None
+        self.next_attempt = time.monotonic() + self.backoff
+        self.backoff = min(self.backoff * 2, self.max_backoff)
@@ -0,0 +1,108 @@
+import json
+from collections import deque, namedtuple
+
+STAR_GAINED = "star gained"
+STAR_LOST = "star lost"
+COIN_SWING = "coin swing"
+TURN_START = "turn start"
+BOARD_ENTERED = "board entered"
+BOARD_LEFT = "board left"
+GAME_END = "game end"
+
+# player is None for events that aren't about a single player. delta is the change in value.
+Event = namedtuple("Event", ["type", "time", "game_id", "turn", "player", "value", "delta"],
+                   defaults=[None, None, None])
+
+
+class EventEngine:
+    """Turns consecutive snapshots into typed events and hands each one to every sink.
+
+    observe() is a Poller listener. It compares the snapshot with the previous one in a fixed number of steps
+    and reads nothing itself. Sinks are callables taking an Event and run on the poller thread, so they
+    should hand slow work off elsewhere.
+
+    Stats are only read on a board, so stat changes that happen in between, e.g. coins won in a minigame,
+    are reported against the last board snapshot once the board is back. Coin changes smaller than
+    coin_threshold are not reported.
+    """
+
+    # The planner fields observe() looks at
+    fields = frozenset(["turn", "final_turn", "stats"])
+
+    def __init__(self, sinks=(), coin_threshold=1):
+        self.sinks = list(sinks)
+        self.coin_threshold = coin_threshold
+        self.game_id = None
+        self.board = False
+        self.turn = None
+        self.players = None
+        self.ended = False
+
+    def emit(self, event):
+        for sink in self.sinks:
+            sink(event)
+
+    def observe(self, snapshot):
+        if snapshot.game_id != self.game_id:
+            if self.board:
+                self.emit(Event(BOARD_LEFT, snapshot.time, self.game_id, self.turn))
+            self.game_id = snapshot.game_id
+            self.board = False
+            self.turn = None
+            self.players = None
+            self.ended = False
+        if not snapshot.game_id:
+            return
+
+        current_turn, final_turn = snapshot.current_turn, snapshot.final_turn
+        # 255 shows up briefly while some games update the turn counter
+        if current_turn != 255:
+            if 0 < current_turn <= final_turn and current_turn != self.turn:
+                if self.turn is not None and current_turn < self.turn:
+                    self.ended = False  # The turn counter went back, so a new game started
+                    self.players = None
+                self.turn = current_turn
+                self.emit(Event(TURN_START, snapshot.time, snapshot.game_id, current_turn, value=current_turn))
+            elif current_turn > final_turn and self.turn is not None and not self.ended:
+                self.ended = True
+                self.emit(Event(GAME_END, snapshot.time, snapshot.game_id, self.turn, value=final_turn))
+
+        if snapshot.board != self.board:
+            self.board = snapshot.board
+            self.emit(Event(BOARD_ENTERED if snapshot.board else BOARD_LEFT, snapshot.time, snapshot.game_id,
+                            self.turn, value=snapshot.scene_id))
+
+        if snapshot.players is not None:
+            if self.players is not None:
+                self.compare(snapshot, self.players, snapshot.players)
+            self.players = snapshot.players
+
+    def compare(self, snapshot, previous, players):
+        for i, (before, after) in enumerate(zip(previous, players)):
+            if after.stars != before.stars:
+                self.emit(Event(STAR_GAINED if after.stars > before.stars else STAR_LOST, snapshot.time,
+                                snapshot.game_id, self.turn, i, after.stars, after.stars - before.stars))
+            if abs(after.coins - before.coins) >= self.coin_threshold:
+                self.emit(Event(COIN_SWING, snapshot.time, snapshot.game_id, self.turn, i, after.coins,
+                                after.coins - before.coins))
+
+
+class JSONLinesSink:
+    """Sink writing every event as a JSON Lines record."""
+
+    def __init__(self, out):
+        self.out = out
+
+    def __call__(self, event):
+        self.out.write(json.dumps(event._asdict()) + "\n")
+        self.out.flush()
+
+
+class EventLog:
+    """Sink keeping the most recent events in memory, e.g. for a UI to show."""
+
+    def __init__(self, max_events=100):
+        self.events = deque(maxlen=max_events)
+
+    def __call__(self, event):
+        self.events.append(event)
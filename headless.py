@@ -0,0 +1,162 @@
+import argparse
+import json
+import sys
+import time
+
+import memory
+import planner
+import poller
+import recorder
+
+# Defaults of --history and --shared-memory, spelled out so parsing arguments doesn't import sqlite3 and mmap
+HISTORY_PATH = "data/history.sqlite3"
+SHARED_MEMORY_PATH = "data/snapshot.shm"
+
+
+class SnapshotWriter:
+    """Poller listener writing a JSON Lines record for every changed snapshot.
+
+    Running on the poller thread means no snapshot is skipped, even when a replay produces them faster than
+    they could be picked up from the poller's queue.
+    """
+
+    def __init__(self, out):
+        self.out = out
+        self.last = None
+
+    def __call__(self, snapshot):
+        # Snapshots that only differ by their timestamp are not a change
+        if poller.same_state(snapshot, self.last):
+            return
+        self.last = snapshot
+        self.out.write(json.dumps(poller.snapshot_to_dict(snapshot)) + "\n")
+        self.out.flush()
+
+
+def stream_every(memory_poller, out, every):
+    """Write a JSON Lines record for the newest snapshot every `every` ms until the poller stops."""
+    last = None
+    deadline = time.monotonic()
+    while memory_poller.is_alive():
+        deadline = max(deadline + every / 1000, time.monotonic())
+        time.sleep(max(0, deadline - time.monotonic()))
+        last = memory_poller.snapshots.get_latest() or last
+        if last is not None:
+            out.write(json.dumps(poller.snapshot_to_dict(last)) + "\n")
+            out.flush()
+
+
+def stream_instances(pool, out):
+    """Write a JSON Lines record, tagged with the Dolphin it came from, for every changed snapshot of any instance."""
+    while True:
+        result = pool.get()
+        if result is None:
+            continue
+        instance, snapshot = result
+        record = {"instance": instance.pid, "process": instance.process_name}
+        record.update(poller.snapshot_to_dict(snapshot))
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream Mario Party Scanner snapshots as JSON Lines, without a window.")
+    parser.add_argument("--output", "-o", help="file to append records to (default: stdout)")
+    parser.add_argument("--poll-interval", type=int, default=20, metavar="MS", help="how often to read game memory")
+    parser.add_argument("--read-gap", type=int, default=256, metavar="BYTES",
+                        help="merge fields less than BYTES apart into one read (default: 256)")
+    parser.add_argument("--every", type=int, metavar="MS",
+                        help="write the newest snapshot every MS milliseconds instead of on each change")
+    parser.add_argument("--events", action="store_true",
+                        help="write events (stars, coin swings, turns, board and game end) instead of snapshots")
+    parser.add_argument("--serve", type=int, metavar="PORT",
+                        help="also serve snapshots over HTTP and WebSocket on localhost:PORT")
+    parser.add_argument("--history", nargs="?", const=HISTORY_PATH, metavar="FILE",
+                        help=f"record board sessions to a SQLite database (default: {HISTORY_PATH})")
+    parser.add_argument("--shared-memory", nargs="?", const=SHARED_MEMORY_PATH, metavar="FILE",
+                        help=f"publish snapshots to a memory-mapped file for local programs (default: "
+                             f"{SHARED_MEMORY_PATH})")
+    parser.add_argument("--multi", action="store_true",
+                        help="poll every running Dolphin, each in its own process, tagging records with its PID")
+    recorder.add_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.multi and (args.record or args.replay or args.serve is not None or args.every is not None or args.history
+                       or args.events or args.shared_memory):
+        parser.error("--multi can't be combined with --record, --replay, --serve, --every, --history, --events or "
+                     "--shared-memory")
+    if args.events and args.every is not None:
+        parser.error("--every only applies to snapshots, not --events")
+    if not args.output and sys.stdout is None:
+        # The windowed executable has no console to stream to
+        parser.error("there is no console to write to, use --output FILE")
+
+    out = open(args.output, "a") if args.output else sys.stdout
+    if args.multi:
+        import instances
+        pool = instances.InstancePool(args.poll_interval / 1000)
+        try:
+            stream_instances(pool, out)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            pool.close()
+            if out is not sys.stdout:
+                out.close()
+        return
+
+    backend = recorder.backend_from_args(args, memory.default_backend)
+    # Snapshots taken from the queue by stream_every() need every field, listeners declare their own
+    memory_poller = poller.Poller(args.poll_interval / 1000, backend, read_gap=args.read_gap,
+                                  fields=planner.FIELDS if args.every is not None else ())
+    snapshot_server = None
+    if args.serve is not None:
+        import events
+        import server
+        snapshot_server = server.SnapshotServer(port=args.serve)
+        snapshot_server.start()
+        memory_poller.listen(snapshot_server.publish)
+        engine = events.EventEngine([snapshot_server.publish_event])
+        memory_poller.listen(engine.observe, engine.fields)
+    session_history = None
+    if args.history:
+        import history
+        session_history = history.History(args.history)
+        session_history.start()
+        memory_poller.listen(session_history.observe, session_history.fields)
+    publisher = None
+    if args.shared_memory:
+        import sharedmem
+        publisher = sharedmem.SnapshotPublisher(args.shared_memory)
+        memory_poller.listen(publisher.publish)
+    if args.events:
+        import events
+        engine = events.EventEngine([events.JSONLinesSink(out)])
+        memory_poller.listen(engine.observe, engine.fields)
+    elif args.every is None:
+        memory_poller.listen(SnapshotWriter(out))
+    memory_poller.start()
+    try:
+        # The poller runs until interrupted, or until a replay runs out of frames
+        if args.every is not None:
+            stream_every(memory_poller, out, args.every)
+        else:
+            while memory_poller.is_alive():
+                memory_poller.join(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        memory_poller.stop()
+        memory_poller.join()
+        if snapshot_server:
+            snapshot_server.stop()
+        if session_history:
+            session_history.close()
+        if publisher:
+            publisher.close()
+        backend.close()
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import os
+import queue
+import sqlite3
+import threading
+
+from layouts import STAT_FIELDS
+
+DEFAULT_PATH = "data/history.sqlite3"
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    game_id TEXT NOT NULL,
+    started REAL NOT NULL,
+    ended REAL,
+    final_turn INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS turns (
+    session_id INTEGER NOT NULL REFERENCES sessions (id),
+    turn INTEGER NOT NULL,
+    time REAL NOT NULL,
+    PRIMARY KEY (session_id, turn)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS player_stats (
+    session_id INTEGER NOT NULL REFERENCES sessions (id),
+    turn INTEGER NOT NULL,
+    player INTEGER NOT NULL,
+    {", ".join(f"{field} INTEGER NOT NULL" for field in STAT_FIELDS)},
+    PRIMARY KEY (session_id, turn, player)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS characters (
+    session_id INTEGER NOT NULL REFERENCES sessions (id),
+    player INTEGER NOT NULL,
+    character TEXT NOT NULL,
+    PRIMARY KEY (session_id, player)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS sessions_game_id ON sessions (game_id);
+CREATE INDEX IF NOT EXISTS characters_character ON characters (character);
+"""
+
+INSERT_STATS = (f"INSERT OR REPLACE INTO player_stats (session_id, turn, player, {', '.join(STAT_FIELDS)}) "
+                f"VALUES (?, ?, ?, {', '.join('?' * len(STAT_FIELDS))})")
+
+
+def connect(path=DEFAULT_PATH, check_same_thread=True):
+    """Open the history database, creating it, its folder and its tables if needed."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    connection = sqlite3.connect(path, check_same_thread=check_same_thread)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+class History(threading.Thread):
+    """Records every board session to SQLite: the session, each turn's final stats and the character picks.
+
+    observe() is a Poller listener. It only follows the snapshots and queues a write when a session starts,
+    a turn ends or a session ends, so it never waits on the database. The writes happen on this thread, one
+    transaction per queued write.
+
+    A session starts with the first board snapshot of a game and ends when the turn counter passes the final
+    turn, the turn counter goes back (a new game), the game changes or the connection drops. Leaving the
+    board for a minigame doesn't end it.
+
+    The database is opened right away, so a path that can't be written raises here rather than on the
+    writer thread.
+    """
+
+    # The planner fields observe() looks at
+    fields = frozenset(["turn", "final_turn", "characters", "stats"])
+
+    def __init__(self, path=DEFAULT_PATH):
+        super().__init__(name="history", daemon=True)
+        self.path = path
+        # Only used by this thread once it runs
+        self.connection = connect(path, check_same_thread=False)
+        self.writes = queue.Queue()
+        self.sessions = {}
+        self.next_session = 0
+        self.session = None
+        self.game_id = None
+        self.turn = None
+
+    def observe(self, snapshot):
+        # Some games briefly read 255 while the turn counter is being updated
+        if snapshot.current_turn == 255:
+            return
+        if self.session is not None and (snapshot.game_id != self.game_id or
+                                         snapshot.current_turn > snapshot.final_turn or
+                                         0 < snapshot.current_turn < self.turn[0]):
+            self.end_session(snapshot.time)
+
+        if not snapshot.board or not 0 < snapshot.current_turn <= snapshot.final_turn:
+            return
+        if self.session is None:
+            self.next_session += 1
+            self.session = self.next_session
+            self.game_id = snapshot.game_id
+            self.writes.put((self.write_session, (self.session, snapshot.game_id, snapshot.time,
+                                                  snapshot.final_turn, snapshot.characters)))
+        elif snapshot.current_turn != self.turn[0]:
+            self.writes.put((self.write_turn, (self.session, *self.turn)))
+        self.turn = (snapshot.current_turn, snapshot.time, snapshot.players)
+
+    def end_session(self, time):
+        self.writes.put((self.write_turn, (self.session, *self.turn)))
+        self.writes.put((self.write_end, (self.session, time)))
+        self.session = None
+        self.turn = None
+
+    def run(self):
+        connection = self.connection
+        try:
+            while True:
+                write = self.writes.get()
+                if write is None:
+                    break
+                method, args = write
+                with connection:
+                    method(connection, *args)
+        finally:
+            connection.close()
+
+    def close(self, time=None):
+        """End the running session and wait for every queued write to finish."""
+        if self.session is not None:
+            self.end_session(time if time is not None else self.turn[1])
+        self.writes.put(None)
+        self.join()
+
+    def write_session(self, connection, session, game_id, started, final_turn, characters):
+        cursor = connection.execute("INSERT INTO sessions (game_id, started, final_turn) VALUES (?, ?, ?)",
+                                    (game_id, started, final_turn))
+        self.sessions[session] = cursor.lastrowid
+        connection.executemany("INSERT INTO characters (session_id, player, character) VALUES (?, ?, ?)",
+                               [(cursor.lastrowid, i, character) for i, character in enumerate(characters)])
+
+    def write_turn(self, connection, session, turn, time, players):
+        session_id = self.sessions[session]
+        connection.execute("INSERT OR REPLACE INTO turns (session_id, turn, time) VALUES (?, ?, ?)",
+                           (session_id, turn, time))
+        connection.executemany(INSERT_STATS, [(session_id, turn, i, *stats) for i, stats in enumerate(players)])
+
+    def write_end(self, connection, session, time):
+        connection.execute("UPDATE sessions SET ended = ? WHERE id = ?", (time, self.sessions.pop(session)))
@@ -0,0 +1,50 @@
+import os
+from collections import OrderedDict
+
+import functions
+import instrumentation
+
+
+class ImageCache:
+    """LRU cache of decoded and resized PhotoImages, keyed by (game folder, asset name, size).
+
+    Each asset is read from disk and resized once; later lookups return the same PhotoImage until the entry
+    is evicted. A different size is a different key, so a size change in config.json loads fresh images.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self.images = OrderedDict()
+
+    def get(self, folder, name, size):
+        key = (folder, name, size)
+        if key in self.images:
+            self.images.move_to_end(key)
+            return self.images[key]
+
+        with instrumentation.span("image load"):
+            image = self.load(folder, name, size)
+        self.images[key] = image
+        if len(self.images) > self.max_entries:
+            self.images.popitem(last=False)
+        return image
+
+    def load(self, folder, name, size):
+        from PIL import Image, ImageTk
+
+        image_path = functions.resource_path(f"assets/{folder}/{name}.png")
+        try:
+            if os.path.exists(image_path):
+                with Image.open(image_path) as image:
+                    return ImageTk.PhotoImage(image.resize((size, size), Image.LANCZOS))
+        except:
+            pass
+        return None
+
+    def discard(self, size, names):
+        """Drop the cached images of the given asset names at size, e.g. after a size change in config.json."""
+        for key in [key for key in self.images if key[2] == size and key[1] in names]:
+            del self.images[key]
+
+    def clear(self):
+        self.images.clear()
@@ -0,0 +1,117 @@
+import collections
+import multiprocessing
+import queue
+import time
+
+import backends
+import poller
+
+
+def split_ambiguous(instances):
+    """Split instances into those with a process name of their own and those sharing one with another.
+
+    DME picks the process to hook by executable name, so instances sharing a name can't be told apart.
+    """
+    counts = collections.Counter(instance.process_name for instance in instances)
+    unique = [instance for instance in instances if counts[instance.process_name] == 1]
+    ambiguous = [instance for instance in instances if counts[instance.process_name] > 1]
+    return unique, ambiguous
+
+
+class Forwarder:
+    """Poller listener passing changed snapshots of one instance to the pool's result queue."""
+
+    def __init__(self, instance, results):
+        self.instance = instance
+        self.results = results
+        self.last = None
+
+    def __call__(self, snapshot):
+        if not poller.same_state(snapshot, self.last):
+            self.last = snapshot
+            self.results.put((self.instance, snapshot))
+
+
+def run_worker(instance, interval, results, stopped, make_backend):
+    """Entry point of a worker process: poll one Dolphin until told to stop."""
+    backend = make_backend(instance.process_name)
+    memory_poller = poller.Poller(interval, backend)
+    memory_poller.listen(Forwarder(instance, results))
+    memory_poller.start()
+    try:
+        stopped.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        memory_poller.stop()
+        memory_poller.join()
+        backend.close()
+
+
+class InstancePool:
+    """Polls every running Dolphin at once, one worker process per instance.
+
+    dolphin_memory_engine holds a single hook per process, so each instance gets a process of its own with
+    its own Poller, and instances never slow each other down. Workers only send snapshots that changed, and
+    get() merges them into one stream of (Instance, Snapshot) pairs. Dolphins that start later are picked up
+    by rescanning every rescan_interval seconds, and workers of Dolphins that closed are stopped.
+
+    Dolphins running from executables with the same name would all be served by whichever one DME hooks,
+    so they are skipped, with a message, until each runs from an executable of its own.
+    """
+
+    def __init__(self, interval=0.02, rescan_interval=5, discover=backends.discover_instances,
+                 make_backend=backends.DolphinBackend):
+        self.interval = interval
+        self.rescan_interval = rescan_interval
+        self.discover = discover
+        self.make_backend = make_backend
+        self.context = multiprocessing.get_context("spawn")
+        self.results = self.context.Queue()
+        self.workers = {}
+        self.next_scan = 0
+        self.ambiguous = frozenset()
+
+    def scan(self):
+        instances, ambiguous = split_ambiguous(self.discover())
+        instances = set(instances)
+        if frozenset(ambiguous) != self.ambiguous:
+            self.ambiguous = frozenset(ambiguous)
+            for process_name in sorted({instance.process_name for instance in ambiguous}):
+                pids = ", ".join(str(instance.pid) for instance in ambiguous if instance.process_name == process_name)
+                print(f"Skipping the Dolphins with PIDs {pids}: they all run {process_name}, and memory can only "
+                      f"be read by executable name. Give each copy of Dolphin a differently named executable.")
+        for instance in list(self.workers):
+            if instance not in instances:
+                self.stop_worker(instance)
+        for instance in instances:
+            if instance not in self.workers:
+                self.start_worker(instance)
+        self.next_scan = time.monotonic() + self.rescan_interval
+
+    def start_worker(self, instance):
+        stopped = self.context.Event()
+        process = self.context.Process(target=run_worker, name=f"poller {instance.pid}", daemon=True,
+                                       args=(instance, self.interval, self.results, stopped, self.make_backend))
+        process.start()
+        self.workers[instance] = (process, stopped)
+
+    def stop_worker(self, instance):
+        process, stopped = self.workers.pop(instance)
+        stopped.set()
+        process.join(5)
+        if process.is_alive():
+            process.terminate()
+
+    def get(self, timeout=1):
+        """Return the next changed (Instance, Snapshot), or None if nothing arrived within timeout seconds."""
+        if time.monotonic() >= self.next_scan:
+            self.scan()
+        try:
+            return self.results.get(timeout=min(timeout, max(0, self.next_scan - time.monotonic())))
+        except queue.Empty:
+            return None
+
+    def close(self):
+        for instance in list(self.workers):
+            self.stop_worker(instance)
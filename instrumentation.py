@@ -0,0 +1,99 @@
+import time
+from collections import deque
+
+STAGES = ("attach", "game id read", "planned read", "scene read", "player stat read", "image load", "widget update",
+          "file write")
+
+
+class NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+class Span:
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stage.append(time.perf_counter() - self.start)
+        return False
+
+
+class Instrumentation:
+    """Timing spans and event counters for the refresh loop.
+
+    Each stage keeps a rolling window of its latest durations. While disabled, span() hands out a shared
+    no-op span and count() returns straight away, so the instrumentation costs next to nothing.
+    """
+
+    def __init__(self, window=512):
+        self.enabled = False
+        self.window = window
+        self.stages = {}
+        self.counters = {}
+        self.rate_totals = {}
+        self.rate_time = time.monotonic()
+
+    def enable(self, enabled=True):
+        """Turn recording on or off. Turning it off drops everything recorded so far."""
+        self.enabled = enabled
+        if not enabled:
+            self.stages.clear()
+            self.counters.clear()
+            self.rate_totals.clear()
+        self.rate_time = time.monotonic()
+
+    def span(self, name):
+        if not self.enabled:
+            return NULL_SPAN
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages.setdefault(name, deque(maxlen=self.window))
+        return Span(stage)
+
+    def count(self, name, amount=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def percentiles(self, name):
+        """Return the (p50, p99) duration of a stage in seconds, or None if it wasn't timed yet."""
+        samples = sorted(self.stages.get(name, ()))
+        if not samples:
+            return None
+        return samples[len(samples) // 2], samples[min(len(samples) - 1, len(samples) * 99 // 100)]
+
+    def rates(self):
+        """Return how often each counter went up per second since the last call."""
+        now = time.monotonic()
+        elapsed = now - self.rate_time
+        counters = dict(self.counters)
+        rates = {name: (total - self.rate_totals.get(name, 0)) / elapsed for name, total in counters.items()}
+        self.rate_totals = counters
+        self.rate_time = now
+        return rates
+
+    def summary(self):
+        lines = []
+        for name in STAGES:
+            timing = self.percentiles(name)
+            if timing:
+                lines.append(f"{name:<18} p50 {timing[0] * 1e6:8.1f} us   p99 {timing[1] * 1e6:8.1f} us")
+        rates = self.rates()
+        lines.append(f"tick rate {rates.get('poll', 0):.1f}/s   frame rate {rates.get('frame', 0):.1f}/s   "
+                     f"emulator calls {rates.get('emulator call', 0):.1f}/s")
+        return "\n".join(lines)
+
+
+instrumentation = Instrumentation()
+span = instrumentation.span
+count = instrumentation.count
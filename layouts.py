@@ -0,0 +1,222 @@
+import struct
+from collections import namedtuple
+from types import MappingProxyType
+
+STAT_FIELDS = ("stars", "coins", "mg", "coinStar", "happening", "running", "shopping", "red")
+WIDTH_FORMATS = {1: "B", 2: "H", 4: "I"}
+ENDIAN_FORMATS = {"big": ">", "little": "<"}
+
+# A player stat: offset from the first player's record and width in bytes.
+# players lists explicit offsets (from the first record) for stats that don't follow the player stride.
+Stat = namedtuple("Stat", ["offset", "width", "players"], defaults=[2, None])
+
+# Table data for one game. Addresses are absolute, player stats are relative to player_base.
+LayoutData = namedtuple("LayoutData", [
+    "folder", "endian", "player_base", "player_stride", "stats",
+    "turn", "final_turn", "scene", "characters", "character_stride", "character_names",
+    "board_scenes", "icons"
+])
+
+MP4_DATA = LayoutData(
+    folder="mp4",
+    endian="big",
+    player_base=0x8018FC4E,
+    player_stride=0x30,
+    stats={
+        "stars": Stat(0x14),
+        "coins": Stat(0x06),
+        "mg": Stat(0x08),
+        "coinStar": Stat(0x0C),
+        "happening": Stat(0x00, 1)
+    },
+    turn=0x8018FCFC,
+    final_turn=0x8018FCFD,
+    scene=0x801D3CE3,
+    characters=0x8018FC11,
+    character_stride=0x0A,
+    character_names=("mario", "luigi", "peach", "yoshi", "wario", "dk", "daisy", "waluigi"),
+    board_scenes=(89, 90, 91, 92, 93, 94),
+    icons={"coinStar": "coins"}
+)
+
+LAYOUT_DATA = {
+    "GMPE01": MP4_DATA,
+    "GMPEDX": MP4_DATA,
+    "GP5E01": LayoutData(
+        folder="mp5",
+        endian="big",
+        player_base=0x8022A087,
+        player_stride=0x108,
+        stats={
+            "stars": Stat(0x1D),
+            "coins": Stat(0x09),
+            "mg": Stat(0x0B),
+            "coinStar": Stat(0x0F),
+            "happening": Stat(0x00, 1)
+        },
+        turn=0x8022A494,
+        final_turn=0x8022A495,
+        scene=0x80288863,
+        characters=0x8022A049,
+        character_stride=0x0A,
+        character_names=("mario", "luigi", "peach", "yoshi", "wario", "daisy", "waluigi", "toad", "boo", "koopakid"),
+        board_scenes=(118, 120, 122, 124, 126, 128, 130),
+        icons={"coinStar": "coins"}
+    ),
+    "GP6E01": LayoutData(
+        folder="mp6",
+        endian="big",
+        player_base=0x80265767,
+        player_stride=0x108,
+        stats={
+            "stars": Stat(0x19),
+            "coins": Stat(0x05),
+            "mg": Stat(0x07),
+            "coinStar": Stat(0x1D),
+            "happening": Stat(0x00, 1, players=(0x000, 0x107, 0x210, 0x317))
+        },
+        turn=0x80265B74,
+        final_turn=0x80265B75,
+        scene=0x802C0257,
+        characters=0x80265729,
+        character_stride=0x0A,
+        character_names=("mario", "luigi", "peach", "yoshi", "wario", "daisy", "waluigi", "toad", "boo", "koopakid",
+                         "toadette"),
+        board_scenes=(123, 124, 125, 126, 127, 128),
+        icons={}
+    ),
+    "GP7E01": LayoutData(
+        folder="mp7",
+        endian="big",
+        player_base=0x80290CB0,
+        player_stride=0x110,
+        stats={
+            "stars": Stat(0x20),
+            "coins": Stat(0x0E),
+            "mg": Stat(0x10),
+            "coinStar": Stat(0x24),
+            "happening": Stat(0x07, 1),
+            "running": Stat(0x00),
+            "shopping": Stat(0x26),
+            "red": Stat(0x05, 1)
+        },
+        turn=0x8029151C,
+        final_turn=0x8029151D,
+        scene=0x802F2F3F,
+        characters=0x80290C49,
+        character_stride=0x0A,
+        character_names=("mario", "luigi", "peach", "yoshi", "wario", "daisy", "waluigi", "toad", "boo", "toadette",
+                         "birdo", "drybones"),
+        board_scenes=(122, 123, 124, 125, 126, 127),
+        icons={}
+    ),
+    "RM8E01": LayoutData(
+        folder="mp8",
+        endian="big",
+        player_base=0x8022831E,
+        player_stride=0x118,
+        stats={
+            "stars": Stat(0x72, players=(0x72, 0x8B, 0x95, 0x9F)),
+            "coins": Stat(0x00)
+        },
+        turn=0x80228764,
+        final_turn=0x80228765,
+        scene=0x802CD223,
+        characters=0x802282D1,
+        character_stride=0x0A,
+        character_names=("mario", "luigi", "peach", "yoshi", "wario", "daisy", "waluigi", "toad", "boo", "toadette",
+                         "birdo", "drybones", "hammerbro", "blooper"),
+        board_scenes=(16, 17, 18, 19, 20, 21),
+        icons={}
+    )
+}
+
+# Asset name of each stat icon, unless a game overrides it in its icons table
+DEFAULT_ICONS = {
+    "stars": "stars",
+    "coins": "coins",
+    "mg": "minigame",
+    "coinStar": "item",
+    "happening": "happening",
+    "running": "running",
+    "shopping": "shopping",
+    "red": "redspace"
+}
+
+
+class GameLayout:
+    """Memory layout of one game, with its struct decoders compiled once."""
+
+    def __init__(self, game_id, data):
+        self.game_id = game_id
+        self.data = data
+        self.folder = data.folder
+        self.stat_fields = tuple(field for field in STAT_FIELDS if field in data.stats)
+        self.board_scenes = frozenset(data.board_scenes)
+        self.icons = MappingProxyType({field: data.icons.get(field, DEFAULT_ICONS[field]) for field in STAT_FIELDS})
+        self.character_names = data.character_names
+
+        endian = ENDIAN_FORMATS[data.endian]
+        self.byte = struct.Struct(endian + "B")
+        self.turn = (data.turn, self.byte)
+        self.final_turn = (data.final_turn, self.byte)
+        self.scene = (data.scene, self.byte)
+        self.characters = (data.characters, self.compile_struct(
+            endian, [(i * data.character_stride, 1) for i in range(4)]))
+
+        # (offset from player_base, width, player, field) for every player stat
+        entries = []
+        for field in self.stat_fields:
+            stat = data.stats[field]
+            offsets = stat.players or [stat.offset + i * data.player_stride for i in range(4)]
+            for i, offset in enumerate(offsets):
+                entries.append((offset, stat.width, i, field))
+        self.stat_addresses = MappingProxyType(
+            {(i, field): (data.player_base + offset, width) for offset, width, i, field in entries})
+
+        self.stats = self.compile_stats(endian, entries)
+        self.player_stats = tuple(
+            self.compile_stats(endian, [entry for entry in entries if entry[2] == i]) for i in range(4))
+        # The bare (address, struct) decoders, so reads don't slice the stats tuples every tick
+        self.stats_decoder = self.stats[:2]
+        self.player_decoders = tuple(stats[:2] for stats in self.player_stats)
+
+    def compile_stats(self, endian, entries):
+        """Return (address, struct, order) reading every entry in one go.
+
+        order gives the (player, field) of each value the struct unpacks.
+        """
+        entries = sorted(entries)
+        start = entries[0][0]
+        decoder = self.compile_struct(endian, [(offset - start, width) for offset, width, _, _ in entries])
+        order = tuple((player, field) for _, _, player, field in entries)
+        return self.data.player_base + start, decoder, order
+
+    @staticmethod
+    def compile_struct(endian, entries):
+        """Build a struct unpacking (offset, width) entries, padding the gaps between them."""
+        fmt = endian
+        position = 0
+        for offset, width in entries:
+            if offset < position:
+                raise ValueError("overlapping fields in memory layout")
+            if offset > position:
+                fmt += f"{offset - position}x"
+            fmt += WIDTH_FORMATS[width]
+            position = offset + width
+        return struct.Struct(fmt)
+
+    def character_name(self, character_id):
+        if 0 <= character_id < len(self.character_names):
+            return self.character_names[character_id]
+        return "mario"
+
+    def asset_path(self, name):
+        return f"assets/{self.folder}/{name}.png"
+
+
+LAYOUTS = MappingProxyType({game_id: GameLayout(game_id, data) for game_id, data in LAYOUT_DATA.items()})
+
+
+def get_layout(game_id):
+    return LAYOUTS.get(game_id)
@@ -0,0 +1,166 @@
+import struct
+from collections import namedtuple
+
+import backends
+import instrumentation
+import layouts
+from layouts import STAT_FIELDS
+
+PlayerStats = namedtuple("PlayerStats", STAT_FIELDS)
+EMPTY_STATS = PlayerStats(*[0] * len(STAT_FIELDS))
+
+GAME_ID = (0x80000000, struct.Struct("6s"))
+
+# Backend used when none is passed in explicitly
+default_backend = backends.DolphinBackend()
+
+
+class ReadContext:
+    """Reads made during one poll tick.
+
+    Each distinct decoder is read and decoded at most once and the values are shared with every caller.
+    prefetch() fills in many decoders from a few merged reads up front. Failed reads are remembered too, so
+    the poller can tell the connection about them.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or default_backend
+        self.values = {}
+        self.failed = False
+
+    def reset(self):
+        """Forget the reads of the last tick, so the context can be reused for the next one."""
+        self.values.clear()
+        self.failed = False
+
+    def prefetch(self, plan):
+        """Read every span of a ReadPlanner plan into its buffer and decode the decoders they cover."""
+        instrumentation.count("emulator call", len(plan))
+        try:
+            self.backend.read_many_into([(span.address, span.buffer) for span in plan])
+        except Exception as e:
+            self.failed = True
+            for span in plan:
+                for decoder, _ in span.members:
+                    self.values[decoder] = e
+            return
+        for span in plan:
+            for decoder, offset in span.members:
+                self.values[decoder] = decoder[1].unpack_from(span.buffer, offset)
+
+    def decode(self, decoder):
+        values = self.values.get(decoder)
+        if values is None:
+            try:
+                values = decode(decoder, backend=self.backend)
+            except Exception as e:
+                self.failed = True
+                values = e
+            self.values[decoder] = values
+        if isinstance(values, Exception):
+            raise values
+        return values
+
+
+def decode(decoder, context=None, backend=None):
+    if context is not None:
+        return context.decode(decoder)
+    address, unpacker = decoder
+    instrumentation.count("emulator call")
+    return unpacker.unpack((backend or default_backend).read(address, unpacker.size))
+
+
+def read_game_id(context=None):
+    """Return the running game ID, "" when no game is booted, or None if memory couldn't be read."""
+    try:
+        game_id = decode(GAME_ID, context)[0]
+        return game_id.rstrip(b"\0").decode("utf-8")
+    except:
+        return None
+
+
+class GameReader:
+    """Reads game memory through the precompiled decoders of one game layout.
+
+    Stats and character names are only rebuilt when the raw values change. Otherwise the previous tuples are
+    returned as they are, so an unchanged tick allocates nothing new for them and consumers can compare them
+    by identity first. Each memo is one (values, result) tuple, replaced in a single assignment, so readers
+    on different threads never see half of one.
+    """
+
+    def __init__(self, layout):
+        self.layout = layout
+        # Index into the flat list of every player's stats of each value the stats struct unpacks
+        self.slots = tuple(player * len(STAT_FIELDS) + STAT_FIELDS.index(field)
+                           for player, field in layout.stats[2])
+        self.last_stats = (None, None)
+        self.last_characters = (None, None)
+
+    def get_current_turn(self, context=None):
+        try:
+            return decode(self.layout.turn, context)[0]
+        except:
+            return 0
+
+    def get_final_turn(self, context=None):
+        try:
+            return decode(self.layout.final_turn, context)[0] or 20
+        except:
+            return 20
+
+    def get_scene_id(self, context=None):
+        try:
+            return decode(self.layout.scene, context)[0]
+        except:
+            return 0
+
+    def get_character_id(self, context=None):
+        try:
+            character_ids = decode(self.layout.characters, context)
+        except:
+            character_ids = (0, 0, 0, 0)
+        last_ids, names = self.last_characters
+        if character_ids != last_ids:
+            names = tuple(self.layout.character_name(character_id) for character_id in character_ids)
+            self.last_characters = (character_ids, names)
+        return names
+
+    def read_player_stats(self, player_index=None, context=None):
+        """Read player stats with a single read_bytes call and decode every field from that buffer.
+
+        Returns a tuple with one PlayerStats per player, or a single PlayerStats when player_index is given.
+        Fields the game does not have, and failed reads, decode as 0.
+        """
+        if player_index is not None:
+            stats = dict.fromkeys(STAT_FIELDS, 0)
+            try:
+                values = decode(self.layout.player_decoders[player_index], context)
+            except:
+                values = ()
+            for (_, field), value in zip(self.layout.player_stats[player_index][2], values):
+                stats[field] = value
+            return PlayerStats(**stats)
+
+        try:
+            values = decode(self.layout.stats_decoder, context)
+        except:
+            values = ()
+        last_values, players = self.last_stats
+        if values != last_values:
+            width = len(STAT_FIELDS)
+            flat = [0] * (4 * width)
+            for slot, value in zip(self.slots, values):
+                flat[slot] = value
+            players = tuple(PlayerStats._make(flat[i * width:(i + 1) * width]) for i in range(4))
+            self.last_stats = (values, players)
+        return players
+
+    def read_player_stat(self, field, player_index):
+        return getattr(self.read_player_stats(player_index), field)
+
+
+READERS = {game_id: GameReader(layout) for game_id, layout in layouts.LAYOUTS.items()}
+
+
+def get_reader(game_id):
+    return READERS.get(game_id)
@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+
+import instrumentation
+
+
+def write_atomic(path, text):
+    """Replace path with text by writing a temporary file next to it and renaming it into place.
+
+    Returns False if the file couldn't be replaced, e.g. because another program holds it open.
+    """
+    directory = os.path.dirname(path) or "."
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        os.replace(temp_path, path)
+        return True
+    except OSError as e:
+        print(f"Error writing {path}: {e}")
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        return False
+
+
+def turn_fields(current_turn, final_turn, names):
+    """Overlay fields for the turn counter and the name of each player's character."""
+    fields = {
+        "turn": f"Turn: {current_turn} / {final_turn}",
+        "current_turn": current_turn,
+        "final_turn": final_turn
+    }
+    for i, name in enumerate(names):
+        fields[f"player{i + 1}_name"] = name
+    return fields
+
+
+def stat_fields(layout, players):
+    """Overlay fields for every stat the game has, e.g. player1_coins."""
+    return {f"player{i + 1}_{field}": getattr(stats, field)
+            for i, stats in enumerate(players) for field in layout.stat_fields}
+
+
+class OverlayWriter:
+    """Writes overlay text files, one per field, only when a field's value changes.
+
+    Changes are collected with update() and written by flush(), so a burst of changes costs one write per
+    file. Files are replaced atomically, so overlay programs never see a half written file. With state_file
+    set, every field is also written to a single JSON file.
+    """
+
+    def __init__(self, directory="data", state_file=None, flush_delay=100):
+        self.directory = directory
+        self.state_file = state_file
+        self.flush_delay = flush_delay
+        self.state = {}
+        self.written = {}
+        self.pending = {}
+        self.state_pending = False
+
+    def update(self, fields):
+        """Queue the fields whose value differs from what was last written. Returns True if a flush is needed."""
+        for name, value in fields.items():
+            if self.state.get(name) != value:
+                self.state[name] = value
+                self.state_pending = True
+            if self.written.get(name) != value:
+                self.pending[name] = value
+            else:
+                self.pending.pop(name, None)
+        return bool(self.pending) or (self.state_file is not None and self.state_pending)
+
+    def flush(self):
+        with instrumentation.span("file write"):
+            self.write_pending()
+
+    def write_pending(self):
+        for name, value in list(self.pending.items()):
+            if write_atomic(os.path.join(self.directory, f"{name}.txt"), f"{value}\n"):
+                self.written[name] = value
+                del self.pending[name]
+
+        if self.state_file and self.state_pending:
+            if write_atomic(os.path.join(self.directory, self.state_file), json.dumps(self.state, indent=4)):
+                self.state_pending = False
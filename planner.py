@@ -0,0 +1,60 @@
+from collections import namedtuple
+
+# Everything the poller can read for a game. Consumers ask for a subset of these.
+FIELDS = frozenset(["turn", "final_turn", "scene", "characters", "stats"])
+
+# One backend read covering the decoders in members, each as a (decoder, offset into the read) pair. buffer is
+# the bytearray the read lands in, reused by every poll with the same plan.
+Span = namedtuple("Span", ["address", "size", "members", "buffer"])
+
+
+def layout_decoders(layout):
+    """The (address, Struct) decoder of every field of a layout."""
+    return {
+        "turn": layout.turn,
+        "final_turn": layout.final_turn,
+        "scene": layout.scene,
+        "characters": layout.characters,
+        "stats": layout.stats_decoder
+    }
+
+
+def merge(decoders, gap):
+    """Group decoders into as few spans as possible, joining ranges less than gap bytes apart.
+
+    A larger gap trades bytes read for fewer backend calls.
+    """
+    spans = []
+    start = end = None
+    members = []
+    for decoder in sorted(set(decoders), key=lambda decoder: decoder[0]):
+        address, unpacker = decoder
+        if start is not None and address - end > gap:
+            spans.append(Span(start, end - start, tuple(members), bytearray(end - start)))
+            start = None
+        if start is None:
+            start, end, members = address, address, []
+        members.append((decoder, address - start))
+        end = max(end, address + unpacker.size)
+    if start is not None:
+        spans.append(Span(start, end - start, tuple(members), bytearray(end - start)))
+    return tuple(spans)
+
+
+class ReadPlanner:
+    """Plans the reads for a set of fields of a game, caching each plan by game ID and field set.
+
+    Plans own the buffers their reads land in, so a planner must only be used by one thread.
+    """
+
+    def __init__(self, gap=256):
+        self.gap = gap
+        self.plans = {}
+
+    def plan(self, layout, fields):
+        key = (layout.game_id, fields)
+        plan = self.plans.get(key)
+        if plan is None:
+            decoders = layout_decoders(layout)
+            plan = self.plans[key] = merge([decoders[field] for field in fields], self.gap)
+        return plan
@@ -0,0 +1,196 @@
+import threading
+import time
+import traceback
+from collections import namedtuple
+
+import connection
+import instrumentation
+import memory
+import planner
+
+# Everything the UI renders from one poll. players is None outside of board scenes.
+Snapshot = namedtuple("Snapshot", ["time", "connection", "game_id", "scene_id", "board", "current_turn",
+                                   "final_turn", "characters", "players"])
+
+
+def same_state(snapshot, other):
+    """Whether two snapshots hold the same state, whenever they were taken. other may be None.
+
+    Compares field by field instead of slicing, so checking an unchanged tick allocates nothing. The reader
+    hands out the same stats and character tuples while memory doesn't change, so those compare by identity.
+    """
+    return (other is not None and snapshot.connection == other.connection and snapshot.game_id == other.game_id
+            and snapshot.scene_id == other.scene_id and snapshot.board == other.board
+            and snapshot.current_turn == other.current_turn and snapshot.final_turn == other.final_turn
+            and snapshot.characters == other.characters and snapshot.players == other.players)
+
+
+class LatestQueue:
+    """Bounded queue that only keeps the newest item. Putting replaces whatever is still waiting."""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.item = None
+
+    def put(self, item):
+        with self.condition:
+            self.item = item
+            self.condition.notify_all()
+
+    def get_latest(self, timeout=0):
+        """Take the newest item, waiting up to timeout seconds. Returns None if nothing arrived."""
+        with self.condition:
+            if self.item is None and timeout:
+                self.condition.wait(timeout)
+            item, self.item = self.item, None
+            return item
+
+
+class Poller(threading.Thread):
+    """Reads game memory on a background thread and publishes Snapshots to a LatestQueue.
+
+    The poll rate adapts to the game. While anything changes it polls every interval seconds; each poll that
+    changes nothing stretches the delay by BACKOFF, up to board_interval on a board and idle_interval in
+    menus, minigames and while detached. The first change, be it a stat, the scene or the turn counters,
+    snaps back to interval. The turn bytes are read on every poll, so the board cap bounds how late a turn
+    boundary can be seen.
+
+    Every consumer declares the planner fields it needs: fields for whoever takes snapshots from the queue,
+    and listen() or require() for the others. Each poll only reads those, plus the scene, through a
+    ReadPlanner, which merges fields less than read_gap bytes apart into a single backend read. Fields nobody
+    needs keep their empty values in snapshots.
+    """
+
+    BACKOFF = 1.5
+
+    def __init__(self, interval=0.02, backend=None, board_interval=0.1, idle_interval=0.5, fields=(),
+                 read_gap=256):
+        super().__init__(name="poller", daemon=True)
+        self.interval = interval
+        self.board_interval = max(board_interval, interval)
+        self.idle_interval = max(idle_interval, interval)
+        self.current_interval = interval
+        self.last_snapshot = None
+        self.backend = backend or memory.default_backend
+        self.snapshots = LatestQueue()
+        self.connection = connection.ConnectionManager(self.backend)
+        self.stopped = threading.Event()
+        # Called on the poller thread with every snapshot, e.g. to push it to server clients
+        self.listeners = []
+        self.failed_listeners = []
+        self.planner = planner.ReadPlanner(read_gap)
+        # Reused by every poll, like the planner's read buffers
+        self.context = memory.ReadContext(self.backend)
+        self.on_board = False
+        self.fields = frozenset()
+        self.require(fields)
+
+    def require(self, fields):
+        """Add fields a consumer needs to what every poll reads. The scene is always read."""
+        self.fields = self.fields | frozenset(fields)
+        self.board_fields = self.fields | {"scene"}
+        self.idle_fields = self.board_fields - {"stats"}
+
+    def listen(self, listener, fields=planner.FIELDS):
+        """Call listener with every snapshot on the poller thread, reading the fields it needs."""
+        self.require(fields)
+        self.listeners.append(listener)
+
+    def run(self):
+        deadline = time.monotonic()
+        while not self.stopped.is_set():
+            snapshot = self.tick()
+            self.snapshots.put(snapshot)
+            self.notify(snapshot)
+            if self.backend.finished:
+                self.stopped.set()
+                break
+            # Keep a steady cadence, skipping ticks that were missed entirely
+            deadline += self.adapt(snapshot)
+            if self.backend.frame_driven:
+                continue
+            now = time.monotonic()
+            if deadline < now:
+                deadline = now
+            self.stopped.wait(deadline - now)
+
+    def stop(self):
+        self.stopped.set()
+
+    def notify(self, snapshot):
+        """Call every listener with snapshot. A failing listener is reported, not allowed to stop polling."""
+        for listener in self.listeners:
+            try:
+                listener(snapshot)
+            except Exception:
+                # Only the first failure of each listener is printed, so one failing every poll doesn't flood
+                if listener not in self.failed_listeners:
+                    self.failed_listeners.append(listener)
+                    print(f"Poller listener {listener!r} failed, further errors from it are not shown:")
+                    traceback.print_exc()
+
+    def adapt(self, snapshot):
+        """Return the delay before the next poll, given what changed since the last one."""
+        previous, self.last_snapshot = self.last_snapshot, snapshot
+        if not same_state(snapshot, previous) or self.backend.frame_driven:
+            self.current_interval = self.interval
+        else:
+            limit = self.board_interval if snapshot.board else self.idle_interval
+            self.current_interval = min(self.current_interval * self.BACKOFF, limit)
+        return self.current_interval
+
+    def tick(self):
+        """Poll once and let the backend know the frame is over."""
+        snapshot = self.poll()
+        self.backend.end_frame()
+        instrumentation.count("poll")
+        return snapshot
+
+    def poll(self):
+        context = self.context
+        context.reset()
+        game_id = self.connection.poll(context)
+        reader = memory.get_reader(game_id)
+        if reader is None:
+            return self.empty_snapshot(game_id)
+
+        # Stats only matter on a board, which the last poll tells ahead of reading the scene. If the board
+        # shows up in between, the stats are read on their own below.
+        with instrumentation.span("planned read"):
+            context.prefetch(self.planner.plan(reader.layout, self.board_fields if self.on_board else self.idle_fields))
+        with instrumentation.span("scene read"):
+            scene_id = reader.get_scene_id(context)
+        board = self.on_board = scene_id in reader.layout.board_scenes
+        players = None
+        if board and "stats" in self.fields:
+            with instrumentation.span("player stat read"):
+                players = reader.read_player_stats(context=context)
+        fields = self.fields
+        snapshot = Snapshot(
+            time.time(),
+            self.connection.state,
+            game_id,
+            scene_id,
+            board,
+            reader.get_current_turn(context) if "turn" in fields else 0,
+            reader.get_final_turn(context) if "final_turn" in fields else 20,
+            reader.get_character_id(context) if "characters" in fields else (),
+            players
+        )
+
+        if context.failed:
+            self.connection.read_failed()
+            return self.empty_snapshot(None)
+        return snapshot
+
+    def empty_snapshot(self, game_id):
+        return Snapshot(time.time(), self.connection.state, game_id, 0, False, 0, 20, (), None)
+
+
+def snapshot_to_dict(snapshot):
+    """Convert a Snapshot to plain JSON serializable types."""
+    record = snapshot._asdict()
+    record["characters"] = list(snapshot.characters)
+    if snapshot.players is not None:
+        record["players"] = [stats._asdict() for stats in snapshot.players]
+    return record
@@ -0,0 +1,209 @@
+import mmap
+import struct
+import time
+
+import backends
+
+MAGIC = b"MPSREC2\n"
+FRAME_HEADER = struct.Struct("<IdH")
+# Sizes and offsets are 32 bits wide, since merged reads grow past 64 KiB with a large readGap
+REGION_HEADER = struct.Struct("<III")
+RUN_HEADER = struct.Struct("<II")
+# Region and run headers of every recording format that can be replayed, by magic
+FORMATS = {
+    b"MPSREC1\n": (struct.Struct("<IHH"), struct.Struct("<HH")),
+    MAGIC: (REGION_HEADER, RUN_HEADER)
+}
+
+
+def diff_runs(old, new, min_gap=8):
+    """Return (offset, data) runs covering every byte where new differs from old.
+
+    Runs separated by fewer than min_gap equal bytes are merged, since a run header costs 8 bytes.
+    """
+    runs = []
+    start = end = None
+    for i in range(len(new)):
+        if old[i] != new[i]:
+            if start is not None and i - end < min_gap:
+                end = i + 1
+            else:
+                if start is not None:
+                    runs.append((start, new[start:end]))
+                start, end = i, i + 1
+    if start is not None:
+        runs.append((start, new[start:end]))
+    return runs
+
+
+class Recorder(backends.MemoryBackend):
+    """Backend wrapper that records every region read through it to a session file.
+
+    Each poll becomes one timestamped frame holding only the bytes that changed since the previous frame.
+    """
+
+    def __init__(self, backend, path):
+        self.backend = backend
+        self.file = open(path, "wb")
+        self.file.write(MAGIC)
+        self.regions = {}
+        self.frame = {}
+        self.last_flush = time.monotonic()
+
+    @property
+    def frame_driven(self):
+        return self.backend.frame_driven
+
+    @property
+    def finished(self):
+        return self.backend.finished
+
+    def hook(self):
+        return self.backend.hook()
+
+    def is_hooked(self):
+        return self.backend.is_hooked()
+
+    def unhook(self):
+        self.backend.unhook()
+
+    def read(self, address, size):
+        data = self.backend.read(address, size)
+        self.frame[(address, size)] = data
+        return data
+
+    def read_many(self, requests):
+        results = self.backend.read_many(requests)
+        for request, data in zip(requests, results):
+            self.frame[request] = data
+        return results
+
+    def read_into(self, address, buffer):
+        self.backend.read_into(address, buffer)
+        self.frame[(address, len(buffer))] = bytes(buffer)
+
+    def read_many_into(self, requests):
+        self.backend.read_many_into(requests)
+        for address, buffer in requests:
+            self.frame[(address, len(buffer))] = bytes(buffer)
+
+    def end_frame(self):
+        self.backend.end_frame()
+        records = []
+        for (address, size), data in self.frame.items():
+            old = self.regions.get((address, size))
+            if old == data:
+                continue
+            runs = [(0, data)] if old is None or len(old) != len(data) else diff_runs(old, data)
+            self.regions[(address, size)] = data
+            record = REGION_HEADER.pack(address, len(data), len(runs))
+            record += b"".join(RUN_HEADER.pack(offset, len(run)) + run for offset, run in runs)
+            records.append(record)
+        self.frame = {}
+
+        body = b"".join(records)
+        self.file.write(FRAME_HEADER.pack(FRAME_HEADER.size + len(body), time.time(), len(records)) + body)
+        if time.monotonic() - self.last_flush > 1:
+            self.file.flush()
+            self.last_flush = time.monotonic()
+
+    def close(self):
+        self.file.close()
+        self.backend.close()
+
+
+def read_frames(path):
+    """Yield (timestamp, [(address, [(offset, data), ...]), ...]) for every frame of a recording.
+
+    The file is memory-mapped, so long sessions are never loaded into RAM as a whole.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        headers = FORMATS.get(data[:len(MAGIC)])
+        if headers is None:
+            raise ValueError(f"{path} is not a Mario Party Scanner recording")
+        region_header, run_header = headers
+        position = len(MAGIC)
+        while position + FRAME_HEADER.size <= len(data):
+            length, timestamp, region_count = FRAME_HEADER.unpack_from(data, position)
+            if position + length > len(data):
+                break  # Frame cut short by the recording stopping mid-write
+            offset = position + FRAME_HEADER.size
+            regions = []
+            for _ in range(region_count):
+                address, _, run_count = region_header.unpack_from(data, offset)
+                offset += region_header.size
+                runs = []
+                for _ in range(run_count):
+                    run_offset, run_length = run_header.unpack_from(data, offset)
+                    offset += run_header.size
+                    runs.append((run_offset, data[offset:offset + run_length]))
+                    offset += run_length
+                regions.append((address, runs))
+            yield timestamp, regions
+            position += length
+
+
+class Replayer(backends.FakeBackend):
+    """Backend serving a recorded session, so it goes through the same decode and render path as live memory.
+
+    With speed set, frames advance with the wall clock (1 is real time). With speed None every poll
+    advances exactly one frame and the poller doesn't wait between polls, which replays as fast as it can
+    go. finished is set once the last frame was played, which ends the poller.
+    """
+
+    def __init__(self, path, speed=1.0):
+        super().__init__()
+        self.speed = speed
+        self.frame_driven = speed is None
+        self.frames = read_frames(path)
+        self.finished = False
+        self.next_frame = next(self.frames, None)
+        self.start_time = None
+        self.start_timestamp = None
+        self.advance()
+
+    def region(self, address, size):
+        if address >= backends.MEM2_ADDRESS and self.mem2 is None:
+            self.mem2 = bytearray(backends.MEM2_SIZE)
+        return super().region(address, size)
+
+    def apply(self, frame):
+        for address, runs in frame[1]:
+            for offset, data in runs:
+                self.write(address + offset, data)
+
+    def advance(self):
+        """Apply the frames that are due."""
+        if self.next_frame is None:
+            self.finished = True
+            return
+        if self.speed is None or self.start_time is None:
+            if self.start_time is None:
+                self.start_time = time.monotonic()
+                self.start_timestamp = self.next_frame[0]
+            self.apply(self.next_frame)
+            self.next_frame = next(self.frames, None)
+            return
+        due = self.start_timestamp + (time.monotonic() - self.start_time) * self.speed
+        while self.next_frame is not None and self.next_frame[0] <= due:
+            self.apply(self.next_frame)
+            self.next_frame = next(self.frames, None)
+
+    def end_frame(self):
+        self.advance()
+
+
+def add_arguments(parser):
+    parser.add_argument("--record", metavar="FILE", help="record the session's memory reads to FILE")
+    parser.add_argument("--replay", metavar="FILE", help="read memory from a recording instead of Dolphin")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="replay speed, 1 is real time and 0 is as fast as possible (default: 1)")
+
+
+def backend_from_args(args, backend):
+    """Wrap or replace backend as asked for by the --record/--replay arguments."""
+    if args.replay:
+        backend = Replayer(args.replay, args.speed or None)
+    if args.record:
+        backend = Recorder(backend, args.record)
+    return backend
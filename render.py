@@ -0,0 +1,253 @@
+import connection
+import layouts
+import output
+import poller
+
+MISSING = object()
+
+
+class Renderer:
+    """Remembers what each widget last showed and only touches widgets whose state actually changed."""
+
+    def __init__(self):
+        self.options = {}
+        self.visible = {}
+
+    def configure(self, widget, **options):
+        """Call widget.configure with the options that differ from the last render. Returns True if any did."""
+        last = self.options.setdefault(widget, {})
+        changed = {key: value for key, value in options.items() if last.get(key, MISSING) != value}
+        if not changed:
+            return False
+        widget.configure(**changed)
+        last.update(changed)
+        if "image" in changed:
+            widget.image = changed["image"]  # Keep a reference to avoid garbage collection
+        return True
+
+    def grid(self, widget, **options):
+        if self.visible.get(widget) is not True:
+            widget.grid(**options)
+            self.visible[widget] = True
+
+    def grid_forget(self, widget):
+        if self.visible.get(widget) is not False:
+            widget.grid_forget()
+            self.visible[widget] = False
+
+    def forget(self, widget):
+        """Drop what is remembered about widget, so the next render touches it again."""
+        self.options.pop(widget, None)
+        self.visible.pop(widget, None)
+
+
+CONNECTION_TEXT = {
+    connection.DETACHED: "Dolphin not detected",
+    connection.HOOKING: "Hooking Dolphin...",
+    connection.ATTACHED: "Not detected",
+    connection.GAME_DETECTED: "Not detected"
+}
+
+# Grid row and vertical padding of each stat's labels
+STAT_ROWS = {
+    "stars": (3, (5, 2)),
+    "coins": (4, (2, 5)),
+    "mg": (5, (5, 2)),
+    "coinStar": (6, (2, 5)),
+    "happening": (7, (2, 5)),
+    "running": (8, (2, 5)),
+    "red": (9, (2, 5)),
+    "shopping": (10, (2, 5))
+}
+
+CHARACTER_NAMES = {
+    "mario": "Mario",
+    "luigi": "Luigi",
+    "peach": "Peach",
+    "yoshi": "Yoshi",
+    "wario": "Wario",
+    "dk": "Donkey Kong",
+    "daisy": "Daisy",
+    "waluigi": "Waluigi",
+    "boo": "Boo",
+    "koopakid": "Koopa Kid",
+    "toad": "Toad",
+    "toadette": "Toadette",
+    "drybones": "Dry Bones",
+    "birdo": "Birdo",
+    "blooper": "Blooper",
+    "hammerbro": "Hammer Bro"
+}
+
+
+def character_name(character_id, name_overrides):
+    """The name shown for a character: its override from config.json if there is one, else its default name."""
+    return name_overrides.get(character_id, "").strip() or CHARACTER_NAMES.get(character_id, "Unknown")
+
+
+class SnapshotView:
+    """Renders Snapshots onto the turn, portrait, name and stat labels of the dashboard.
+
+    Snapshots that only differ from the last one by their time aren't rendered, and only the values that
+    changed since the last render are formatted. The window and the benchmark both render through this, the
+    benchmark with stand-in widgets. make_stat_labels(field) creates the four labels of a stat row the first
+    time a game with that stat shows up, and write_overlay receives the overlay fields of every render.
+    """
+
+    def __init__(self, renderer, images, turn_label, image_labels, name_labels, make_stat_labels, write_overlay,
+                 name_overrides=None, player_icon_size=150, stats_label_size=26):
+        self.renderer = renderer
+        self.images = images
+        self.turn_label = turn_label
+        self.image_labels = image_labels
+        self.name_labels = name_labels
+        self.make_stat_labels = make_stat_labels
+        self.write_overlay = write_overlay
+        self.name_overrides = name_overrides or {}
+        self.player_icon_size = player_icon_size
+        self.stats_label_size = stats_label_size
+        # Created by show_stat_rows once the game, and with it the stats it has, is known
+        self.stat_labels = {}
+
+        self.snapshot = None
+        self.game_id = None
+        self.layout = None
+        self.initial_load_done = False
+        self.cached_turn = None
+        self.cached_final_turn = None
+        # What the labels show, so text is only formatted for values that changed. None forces a full render.
+        self.rendered_turn = None
+        self.rendered_players = None
+
+    def render(self, snapshot):
+        """Render snapshot if it changed since the last one. Returns whether it did."""
+        if poller.same_state(snapshot, self.snapshot):
+            return False
+        self.snapshot = snapshot
+        self.update_turn_label()
+        self.update_coins_and_stars()
+        return True
+
+    def invalidate(self):
+        """Render the current snapshot again in full, e.g. after names or image sizes changed."""
+        self.rendered_turn = self.rendered_players = None
+        if self.snapshot is not None:
+            self.update_turn_label()
+            self.update_coins_and_stars()
+
+    def attach_game(self, game_id):
+        """Look up the layout of game_id, showing the stat rows of the game when it changes."""
+        if game_id != self.game_id:
+            self.game_id = game_id
+            self.layout = layouts.get_layout(game_id)
+            if self.layout is not None:
+                self.show_stat_rows(self.layout)
+        return self.layout
+
+    def show_stat_rows(self, layout):
+        """Show the stat rows of the fields layout has, creating them the first time, and hide the others."""
+        self.rendered_players = None
+        for field, (row, pady) in STAT_ROWS.items():
+            if field not in layout.stat_fields:
+                for label in self.stat_labels.get(field, ()):
+                    self.renderer.grid_forget(label)
+                continue
+            if field not in self.stat_labels:
+                self.stat_labels[field] = self.make_stat_labels(field)
+            for i, label in enumerate(self.stat_labels[field]):
+                self.renderer.grid(label, row=row, column=i, padx=10, pady=pady, sticky="nsew")
+
+    def update_coins_and_stars(self):
+        snapshot = self.snapshot
+        if snapshot.players is None or self.attach_game(snapshot.game_id) is None:
+            return
+        rendered = self.rendered_players
+        if snapshot.players == rendered:
+            return
+        icon_size = self.stats_label_size + 2
+        for i, stats in enumerate(snapshot.players):
+            before = rendered[i] if rendered is not None else None
+            if stats == before:
+                continue
+            for field in self.layout.stat_fields:
+                value = getattr(stats, field)
+                if before is not None and value == getattr(before, field):
+                    continue
+                image = self.images.get(self.layout.folder, self.layout.icons[field], icon_size)
+                self.renderer.configure(self.stat_labels[field][i], image=image, compound='left', pady=10,
+                                        text=f" {value}")
+        self.rendered_players = snapshot.players
+        self.write_overlay(output.stat_fields(self.layout, snapshot.players))
+
+    def update_turn_label(self):
+        snapshot = self.snapshot
+        game_id = snapshot.game_id
+        self.attach_game(game_id)
+
+        if not game_id:
+            self.renderer.configure(self.turn_label, text=CONNECTION_TEXT[snapshot.connection])
+            self.hide_portraits()
+            return
+
+        current_turn = snapshot.current_turn
+        final_turn = snapshot.final_turn
+
+        if not self.initial_load_done:
+            if snapshot.board:
+                self.initial_load_done = True
+            else:
+                self.renderer.configure(self.turn_label, text="Scene not valid")
+                # Hide portraits and names if scene ID is not valid
+                self.hide_portraits()
+                return
+
+        if current_turn == 255 and self.cached_turn != 255:
+            current_turn = self.cached_turn
+
+        self.cached_turn = current_turn
+
+        if final_turn is None:
+            final_turn = self.cached_final_turn
+
+        if current_turn is None or not final_turn:
+            self.renderer.configure(self.turn_label, text="Not detected")
+            self.hide_portraits()
+            return
+
+        self.cached_final_turn = final_turn
+
+        if (current_turn, final_turn, snapshot.characters) != self.rendered_turn:
+            self.renderer.configure(self.turn_label, text=f"Turn: {current_turn} / {final_turn}")
+            self.update_images(snapshot.characters)
+            names = [character_name(character_id, self.name_overrides) for character_id in snapshot.characters]
+            self.write_overlay(output.turn_fields(current_turn, final_turn, names))
+            self.rendered_turn = (current_turn, final_turn, snapshot.characters)
+
+        if current_turn == 0:
+            self.hide_portraits()
+            return
+
+        for i, (img_label, name_label) in enumerate(zip(self.image_labels, self.name_labels)):
+            self.renderer.grid(img_label, row=1, column=i, padx=10, pady=1, sticky="nsew")
+            self.renderer.grid(name_label, row=2, column=i, padx=10, pady=5, sticky="nsew")
+
+    def hide_portraits(self):
+        self.rendered_turn = None
+        for img_label, name_label in zip(self.image_labels, self.name_labels):
+            self.renderer.grid_forget(img_label)
+            self.renderer.grid_forget(name_label)
+
+    def update_images(self, character_ids):
+        layout = self.layout
+        if layout is None:
+            return
+
+        for i, img_label in enumerate(self.image_labels):
+            if i < len(character_ids):
+                image = self.images.get(layout.folder, character_ids[i], self.player_icon_size)
+                self.renderer.configure(img_label, image=image)
+                name = character_name(character_ids[i], self.name_overrides)
+                self.renderer.configure(self.name_labels[i], text=name)
+            else:
+                self.renderer.configure(img_label, image=None)
+                self.renderer.configure(self.name_labels[i], text="")
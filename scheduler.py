@@ -0,0 +1,62 @@
+import math
+import time
+
+
+class Scheduler:
+    """Runs named jobs on a Tk widget's event loop.
+
+    A name never has more than one pending call: scheduling it again replaces the pending one. Periodic
+    jobs run against fixed deadlines, so time spent in the callback doesn't push later ticks back.
+    """
+
+    def __init__(self, widget):
+        self.widget = widget
+        # name -> id of the pending after() call, or None while the job is running
+        self.jobs = {}
+
+    def every(self, name, interval, callback):
+        """Run callback every interval milliseconds."""
+        self.cancel(name)
+        self.schedule(name, callback, time.monotonic() + interval / 1000, interval)
+
+    def once(self, name, delay, callback):
+        """Run callback a single time after delay milliseconds."""
+        self.cancel(name)
+        self.schedule(name, callback, time.monotonic() + delay / 1000, None)
+
+    def cancel(self, name):
+        after_id = self.jobs.pop(name, None)
+        if after_id is not None:
+            self.widget.after_cancel(after_id)
+
+    def cancel_all(self):
+        for name in list(self.jobs):
+            self.cancel(name)
+
+    def is_pending(self, name):
+        return self.jobs.get(name) is not None
+
+    def schedule(self, name, callback, deadline, interval):
+        delay = max(0, round((deadline - time.monotonic()) * 1000))
+        self.jobs[name] = self.widget.after(delay, self.run, name, callback, deadline, interval)
+
+    def run(self, name, callback, deadline, interval):
+        self.jobs[name] = None
+        try:
+            callback()
+        finally:
+            # Leave the job alone if the callback cancelled or rescheduled it
+            if name in self.jobs and self.jobs[name] is None:
+                del self.jobs[name]
+                if interval is not None:
+                    self.schedule(name, callback, next_deadline(deadline, interval), interval)
+
+
+def next_deadline(deadline, interval):
+    """Return the next deadline on the interval's cadence, skipping ticks that were missed entirely."""
+    step = interval / 1000
+    deadline += step
+    now = time.monotonic()
+    if deadline < now:
+        deadline += math.ceil((now - deadline) / step) * step
+    return deadline
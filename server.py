@@ -0,0 +1,218 @@
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+import threading
+
+import poller
+from layouts import STAT_FIELDS
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+TEXT = 0x1
+CLOSE = 0x8
+PING = 0x9
+PONG = 0xA
+
+# Clients that fall this far behind are dropped instead of buffering updates for them forever
+MAX_CLIENT_BUFFER = 1 << 20
+MAX_MESSAGE_SIZE = 1 << 16
+
+
+def snapshot_fields(snapshot):
+    """Flatten a Snapshot into the field names the overlay files use, e.g. player1_coins."""
+    fields = {
+        "connection": snapshot.connection,
+        "game_id": snapshot.game_id,
+        "scene_id": snapshot.scene_id,
+        "board": snapshot.board,
+        "current_turn": snapshot.current_turn,
+        "final_turn": snapshot.final_turn
+    }
+    for i, character in enumerate(snapshot.characters):
+        fields[f"player{i + 1}_character"] = character
+    if snapshot.players is not None:
+        for i, stats in enumerate(snapshot.players):
+            for field in STAT_FIELDS:
+                fields[f"player{i + 1}_{field}"] = getattr(stats, field)
+    return fields
+
+
+def encode_frame(payload, opcode=TEXT):
+    """Encode an unmasked, unfragmented WebSocket frame, the kind a server sends."""
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    length = len(payload)
+    if length < 126:
+        header = struct.pack(">BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack(">BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack(">BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+
+async def read_frame(reader):
+    """Read one WebSocket frame from a client, returning (opcode, unmasked payload)."""
+    head = await reader.readexactly(2)
+    opcode = head[0] & 0x0F
+    length = head[1] & 0x7F
+    if length == 126:
+        length = struct.unpack(">H", await reader.readexactly(2))[0]
+    elif length == 127:
+        length = struct.unpack(">Q", await reader.readexactly(8))[0]
+    if length > MAX_MESSAGE_SIZE:
+        raise ValueError("WebSocket message too large")
+    mask = await reader.readexactly(4) if head[1] & 0x80 else None
+    payload = await reader.readexactly(length)
+    if mask:
+        payload = bytes(byte ^ mask[i % 4] for i, byte in enumerate(payload))
+    return opcode, payload
+
+
+def http_response(status, body=b"", content_type="application/json", headers=()):
+    lines = [f"HTTP/1.1 {status}", f"Content-Type: {content_type}", f"Content-Length: {len(body)}",
+             "Access-Control-Allow-Origin: *", "Cache-Control: no-store", "Connection: close", *headers]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+
+class SnapshotServer(threading.Thread):
+    """Local HTTP and WebSocket server for overlays, e.g. OBS browser sources.
+
+    GET /snapshot returns every field of the newest snapshot as JSON. A WebSocket on /ws gets the same
+    message once, then a patch holding only the fields that changed whenever the poller sees a change.
+    Fields that disappear, like stats outside of a board, are sent as null. With publish_event() as an
+    EventEngine sink, clients also get each event as {"type": "event", "event": {...}}. Snapshots come from
+    publish() on the poller thread, so any number of clients costs no extra emulator reads, and each patch is
+    encoded once for all clients. The asyncio event loop runs on its own thread.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8765):
+        super().__init__(name="server", daemon=True)
+        self.host = host
+        self.port = port
+        self.loop = None
+        self.stopping = None
+        self.ready = threading.Event()
+        self.last_snapshot = None
+        self.fields = {}
+        self.time = None
+        self.clients = set()
+
+    def run(self):
+        self.loop = asyncio.new_event_loop()
+        try:
+            self.loop.run_until_complete(self.serve())
+        except OSError as e:
+            print(f"Error starting server on {self.host}:{self.port}: {e}")
+        finally:
+            self.ready.set()
+            self.loop.close()
+
+    async def serve(self):
+        self.stopping = asyncio.Event()
+        server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        self.ready.set()
+        async with server:
+            await self.stopping.wait()
+        # Hang up on the WebSocket clients that are still connected and let their handlers finish
+        handlers = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for writer in list(self.clients):
+            writer.close()
+        if handlers:
+            await asyncio.wait(handlers, timeout=1)
+
+    def stop(self):
+        if self.stopping is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.stopping.set)
+
+    def publish(self, snapshot):
+        """Hand a snapshot over from another thread. Snapshots that only differ by their timestamp are dropped."""
+        if self.stopping is None or poller.same_state(snapshot, self.last_snapshot):
+            return
+        self.last_snapshot = snapshot
+        try:
+            self.loop.call_soon_threadsafe(self.update, snapshot)
+        except RuntimeError:
+            pass  # The loop closed, e.g. while the app shuts down
+
+    def publish_event(self, event):
+        """Event sink pushing events to WebSocket clients as they happen. Safe to call from another thread."""
+        if self.stopping is None:
+            return
+        try:
+            self.loop.call_soon_threadsafe(self.broadcast, {"type": "event", "event": event._asdict()})
+        except RuntimeError:
+            pass
+
+    def broadcast(self, message):
+        if self.clients:
+            frame = encode_frame(json.dumps(message))
+            for writer in list(self.clients):
+                self.send(writer, frame)
+
+    def update(self, snapshot):
+        fields = snapshot_fields(snapshot)
+        changes = {name: value for name, value in fields.items()
+                   if name not in self.fields or self.fields[name] != value}
+        changes.update({name: None for name in self.fields if name not in fields})
+        self.fields = fields
+        self.time = snapshot.time
+        if changes:
+            self.broadcast({"type": "patch", "time": self.time, "fields": changes})
+
+    def send(self, writer, frame):
+        if writer.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+            self.clients.discard(writer)
+            writer.close()
+        else:
+            writer.write(frame)
+
+    def snapshot_message(self):
+        return json.dumps({"type": "snapshot", "time": self.time, "fields": self.fields})
+
+    async def handle(self, reader, writer):
+        try:
+            request = await reader.readuntil(b"\r\n\r\n")
+            lines = request.decode("latin-1").split("\r\n")
+            method, path, _ = lines[0].split(" ", 2)
+            headers = {name.strip().lower(): value.strip()
+                       for name, _, value in (line.partition(":") for line in lines[1:] if line)}
+            path = path.split("?", 1)[0]
+
+            if method != "GET":
+                writer.write(http_response("405 Method Not Allowed"))
+            elif path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                await self.websocket(reader, writer, headers)
+            elif path in ("/", "/snapshot"):
+                writer.write(http_response("200 OK", self.snapshot_message().encode("utf-8")))
+            else:
+                writer.write(http_response("404 Not Found"))
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def websocket(self, reader, writer, headers):
+        key = headers.get("sec-websocket-key")
+        if not key:
+            writer.write(http_response("400 Bad Request"))
+            return
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode("ascii")).digest()).decode("ascii")
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode("latin-1"))
+        writer.write(encode_frame(self.snapshot_message()))
+        self.clients.add(writer)
+        try:
+            # Clients have nothing to say, but control frames still need answering
+            while True:
+                opcode, payload = await read_frame(reader)
+                if opcode == CLOSE:
+                    writer.write(encode_frame(payload[:2], CLOSE))
+                    break
+                if opcode == PING:
+                    writer.write(encode_frame(payload, PONG))
+        finally:
+            self.clients.discard(writer)
@@ -0,0 +1,184 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+
+import connection
+import memory
+import poller
+from layouts import STAT_FIELDS
+
+DEFAULT_PATH = "data/snapshot.shm"
+
+MAGIC = b"MPSS"
+FORMAT_VERSION = 1
+
+# Magic, format version, payload size, then the seqlock version at offset 8 so it is 8 byte aligned
+HEADER = struct.Struct("<4sHHQ")
+VERSION = struct.Struct("<Q")
+VERSION_OFFSET = 8
+
+# time, connection, game_id, flags, scene_id, current_turn, final_turn, number of characters, four character
+# names, then every STAT_FIELDS value of player 1, then player 2 and so on
+PAYLOAD = struct.Struct(f"<d16s6sBHBBB{'16s' * 4}{4 * len(STAT_FIELDS)}i")
+PAYLOAD_OFFSET = HEADER.size
+SIZE = HEADER.size + PAYLOAD.size
+
+BOARD = 1
+HAS_PLAYERS = 2
+NO_GAME_ID = 4  # game_id is None, i.e. memory couldn't be read, as opposed to "" for no game booted
+
+NO_STATS = (0,) * (4 * len(STAT_FIELDS))
+
+
+def encode(snapshot):
+    """The PAYLOAD values of a Snapshot."""
+    flags = (BOARD if snapshot.board else 0) | (HAS_PLAYERS if snapshot.players is not None else 0) | \
+            (NO_GAME_ID if snapshot.game_id is None else 0)
+    characters = [name.encode() for name in snapshot.characters] + [b""] * (4 - len(snapshot.characters))
+    stats = NO_STATS if snapshot.players is None else [value for stats in snapshot.players for value in stats]
+    return (snapshot.time, snapshot.connection.encode(), (snapshot.game_id or "").encode(), flags,
+            snapshot.scene_id, snapshot.current_turn, snapshot.final_turn, len(snapshot.characters),
+            *characters, *stats)
+
+
+def decode(values):
+    """Turn PAYLOAD values back into a Snapshot."""
+    taken, connection_state, game_id, flags, scene_id, current_turn, final_turn, count = values[:8]
+    players = None
+    if flags & HAS_PLAYERS:
+        width = len(STAT_FIELDS)
+        stats = values[12:]
+        players = tuple(memory.PlayerStats._make(stats[i * width:(i + 1) * width]) for i in range(4))
+    return poller.Snapshot(
+        taken,
+        connection_state.rstrip(b"\0").decode(),
+        None if flags & NO_GAME_ID else game_id.rstrip(b"\0").decode(),
+        scene_id,
+        bool(flags & BOARD),
+        current_turn,
+        final_turn,
+        tuple(name.rstrip(b"\0").decode() for name in values[8:8 + count]),
+        players
+    )
+
+
+class SnapshotPublisher:
+    """Publishes the newest Snapshot into a fixed layout memory-mapped file, for other local programs to read.
+
+    publish() is a Poller listener. Any number of SnapshotReaders can follow one scanner this way, without
+    each of them hooking Dolphin. Writes use a seqlock: the version is bumped to odd before the payload is
+    written and to the next even number after, so readers retry instead of taking a lock, and the version
+    only changes when the state does. A file under data/ rather than multiprocessing.shared_memory works the
+    same on every platform and doesn't get unlinked by whichever process exits first.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size != SIZE:
+                os.ftruncate(fd, SIZE)
+            self.buffer = mmap.mmap(fd, SIZE)
+        finally:
+            os.close(fd)
+        # Continue the version of an earlier run, so readers that stayed open see every update as new
+        magic, _, _, version = HEADER.unpack_from(self.buffer)
+        self.version = version + (version & 1) if magic == MAGIC else 0
+        HEADER.pack_into(self.buffer, 0, MAGIC, FORMAT_VERSION, PAYLOAD.size, self.version)
+        self.last_snapshot = None
+
+    def publish(self, snapshot):
+        if poller.same_state(snapshot, self.last_snapshot):
+            return
+        self.last_snapshot = snapshot
+        values = encode(snapshot)
+        VERSION.pack_into(self.buffer, VERSION_OFFSET, self.version + 1)
+        PAYLOAD.pack_into(self.buffer, PAYLOAD_OFFSET, *values)
+        self.version += 2
+        VERSION.pack_into(self.buffer, VERSION_OFFSET, self.version)
+
+    def close(self):
+        """Publish that the scanner is gone and unmap the file."""
+        self.publish(poller.Snapshot(time.time(), connection.DETACHED, None, 0, False, 0, 20, (), None))
+        self.buffer.close()
+
+
+class SnapshotReader:
+    """Reads the Snapshots a SnapshotPublisher writes, from any process on the same machine.
+
+    read() decodes straight out of the mapping and retries while the publisher is mid-write, so it never
+    blocks the scanner. version() is one 8 byte read, cheap enough to poll for changes.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, retries=1000):
+        self.retries = retries
+        with open(path, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, format_version, payload_size, _ = HEADER.unpack_from(self.buffer)
+        if magic != MAGIC or format_version != FORMAT_VERSION or payload_size != PAYLOAD.size:
+            self.buffer.close()
+            raise ValueError(f"{path} is not a snapshot file of format version {FORMAT_VERSION}")
+
+    def version(self):
+        """The current version: 0 before the first snapshot, odd while one is being written."""
+        return VERSION.unpack_from(self.buffer, VERSION_OFFSET)[0]
+
+    def read(self):
+        """Return (version, Snapshot) for the newest complete snapshot, or (0, None) if none was published."""
+        for _ in range(self.retries):
+            version = self.version()
+            if version == 0:
+                return 0, None
+            if not version & 1:
+                values = PAYLOAD.unpack_from(self.buffer, PAYLOAD_OFFSET)
+                if self.version() == version:
+                    return version, decode(values)
+            time.sleep(0)
+        raise RuntimeError("The publisher stopped in the middle of an update")
+
+    def wait(self, version, timeout=None, interval=0.005):
+        """Wait for a version other than version and return read(), or None after timeout seconds."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.version() in (version, version + 1):
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(interval)
+        return self.read()
+
+    def close(self):
+        self.buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print the snapshots a running scanner publishes as JSON Lines.")
+    parser.add_argument("path", nargs="?", default=DEFAULT_PATH, help=f"snapshot file (default: {DEFAULT_PATH})")
+    args = parser.parse_args(argv)
+    try:
+        reader = SnapshotReader(args.path)
+    except (OSError, ValueError) as e:
+        parser.exit(1, f"Can't read {args.path}: {e}\n")
+    with reader:
+        version = -2
+        try:
+            while True:
+                version, snapshot = reader.wait(version)
+                if snapshot is not None:
+                    sys.stdout.write(json.dumps(poller.snapshot_to_dict(snapshot)) + "\n")
+                    sys.stdout.flush()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import math
+import os
+
+import pytest
+
+import analytics
+import history
+from layouts import STAT_FIELDS
+
+numpy = pytest.importorskip("numpy")
+
+
+def stats(stars=0, coins=0, mg=0, happening=0):
+    values = dict.fromkeys(STAT_FIELDS, 0)
+    values.update(stars=stars, coins=coins, mg=mg, happening=happening)
+    return tuple(values[field] for field in STAT_FIELDS)
+
+
+def add_session(connection, game_id, started, turns, final_turn=2, ended=True,
+                characters=("mario", "luigi", "peach", "yoshi")):
+    """Insert a session whose turns are lists of the four players' stats."""
+    session_id = connection.execute("INSERT INTO sessions (game_id, started, ended, final_turn) VALUES (?, ?, ?, ?)",
+                                    (game_id, started, started + 60 if ended else None, final_turn)).lastrowid
+    connection.executemany("INSERT INTO characters (session_id, player, character) VALUES (?, ?, ?)",
+                           [(session_id, i, character) for i, character in enumerate(characters)])
+    for turn, players in enumerate(turns, 1):
+        connection.executemany(history.INSERT_STATS,
+                               [(session_id, turn, i, *values) for i, values in enumerate(players)])
+    connection.commit()
+    return session_id
+
+
+def end_session(connection, session_id, turns):
+    for turn, players in turns:
+        connection.executemany(history.INSERT_STATS,
+                               [(session_id, turn, i, *values) for i, values in enumerate(players)])
+    connection.execute("UPDATE sessions SET ended = started + 60 WHERE id = ?", (session_id,))
+    connection.commit()
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / "history.sqlite3")
+    connection = history.connect(path)
+    yield path, connection
+    connection.close()
+
+
+def test_statistics(database):
+    path, connection = database
+    add_session(connection, "GMPE01", 1, [
+        [stats(0, 10), stats(0, 10), stats(0, 10), stats(0, 10)],
+        [stats(2, 5, mg=30), stats(1, 40), stats(0, 0), stats(0, 15)]])
+    add_session(connection, "GMPE01", 2, [
+        [stats(0, 20), stats(0, 20), stats(0, 20), stats(0, 20)],
+        [stats(1, 5), stats(1, 0, mg=50), stats(0, 0), stats(0, 0)]], characters=("luigi", "mario", "peach", "yoshi"))
+    add_session(connection, "RM8E01", 3, [[stats(1, 10), stats(0, 10), stats(0, 10), stats(0, 10)]], final_turn=1)
+    # Abandoned halfway, so left out of the per character and bonus star statistics
+    add_session(connection, "GMPE01", 4, [[stats(5, 50), stats(0, 0), stats(0, 0), stats(0, 0)]])
+
+    arrays = analytics.HistoryArrays.load(path, cache=False)
+    assert list(arrays.games) == ["GMPE01", "RM8E01"]
+    assert arrays.completed().tolist() == [True, True, True, False]
+
+    stars = arrays.average_by_character("stars")
+    names = list(arrays.character_names)
+    assert stars[0, names.index("mario")] == 1.5
+    assert stars[0, names.index("luigi")] == 1
+    assert stars[0, names.index("yoshi")] == 0
+    assert stars[1, names.index("luigi")] == 0
+    assert stars[1, names.index("mario")] == 1
+
+    coins = arrays.curve_by_turn("coins")
+    assert coins[0].tolist() == [(40 + 80 + 50) / 12, (60 + 5) / 8]
+
+    # The minigame star makes player 2 overtake player 1 in the second session only
+    bonus = arrays.bonus_decides_winner("mg")
+    assert bonus[0] == 0.5
+    # Mario Party 8 has no minigame stat, so there is nothing to report rather than 0%
+    assert math.isnan(bonus[1])
+
+
+def test_cache_is_dropped_for_a_recreated_database(database, tmp_path):
+    path, connection = database
+    for started in range(5):
+        add_session(connection, "GMPE01", started, [[stats()] * 4])
+    assert list(analytics.HistoryArrays.load(path).games) == ["GMPE01"]
+    assert os.path.exists(str(tmp_path / "history.npz"))
+
+    connection.close()
+    for name in os.listdir(tmp_path):
+        if name.startswith("history.sqlite3"):
+            os.remove(tmp_path / name)
+    connection = history.connect(path)
+    for started in range(100, 103):
+        add_session(connection, "GP7E01", started, [[stats()] * 4])
+    connection.close()
+
+    arrays = analytics.HistoryArrays.load(path)
+    assert list(arrays.games) == ["GP7E01"]
+    assert arrays.ids.tolist() == [1, 2, 3]
+
+
+def test_open_sessions_are_queried_again(database, tmp_path):
+    path, connection = database
+    turn = [stats(1, 10)] * 4
+    add_session(connection, "GMPE01", 1, [turn, turn])
+    left_open = add_session(connection, "GMPE01", 2, [turn], ended=False)
+    add_session(connection, "GMPE01", 3, [turn, turn])
+
+    arrays = analytics.HistoryArrays.load(path)
+    assert arrays.ended.tolist() == [True, False, True]
+    with numpy.load(str(tmp_path / "history.npz")) as cache:
+        assert cache["ids"].tolist() == [1, 3]
+        assert cache["pending"].tolist() == [left_open]
+
+    end_session(connection, left_open, [(2, [stats(3, 30)] * 4)])
+    add_session(connection, "GMPE01", 4, [turn, turn])
+    cached = analytics.HistoryArrays.load(path)
+    uncached = analytics.HistoryArrays.load(path, cache=False)
+    assert cached.ids.tolist() == [1, 2, 3, 4]
+    assert cached.ended.all()
+    for name in ("final_turn", "characters", "stats", "recorded", "last_turn"):
+        assert numpy.array_equal(getattr(cached, name), getattr(uncached, name))
+    assert cached.final_stats()[1, 0, 0] == 3
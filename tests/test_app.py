@@ -0,0 +1,94 @@
+import types
+
+import pytest
+
+pytest.importorskip("customtkinter")
+import app  # noqa: E402
+import planner  # noqa: E402
+import poller  # noqa: E402
+
+CONFIG = {
+    "name_overrides": {},
+    "player_icon_size": 150,
+    "stats_label_size": 26,
+    "turn_label_size": 40,
+    "bg_color": "#333333",
+    "poll_interval": 20,
+    "board_poll_interval": 100,
+    "idle_poll_interval": 500,
+    "read_gap": 256,
+    "frame_interval": 20,
+    "state_json": False,
+    "debug_overlay": False,
+    "server_enabled": False,
+    "server_port": 8765,
+    "history_enabled": False,
+    "shared_memory_enabled": False,
+    "window_width": 800,
+    "window_height": 400
+}
+
+
+class Recorder:
+    """Records every method called on it."""
+
+    def __init__(self, **attributes):
+        self.calls = []
+        self.__dict__.update(attributes)
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+
+def window(config=CONFIG):
+    """The parts of App that apply_config touches, as stand-ins that record what is done to them."""
+    widgets = Recorder()
+    return types.SimpleNamespace(
+        **config,
+        images=Recorder(), renderer=widgets, image_labels=["portrait"] * 4, turn_label="turn",
+        home_frame=Recorder(), poller=types.SimpleNamespace(), scheduler=Recorder(),
+        overlay=types.SimpleNamespace(state_file=None, state_pending=False),
+        view=Recorder(stat_labels={"coins": ["coins"] * 4}), geometry=Recorder(), set_debug_overlay=Recorder(),
+        refresh=None)
+
+
+def test_unchanged_config_does_nothing():
+    stub = window()
+    app.App.apply_config(stub, dict(CONFIG))
+    assert stub.images.calls == stub.renderer.calls == stub.scheduler.calls == stub.view.calls == []
+    assert vars(stub.poller) == {}
+
+
+def test_only_changed_settings_are_applied():
+    stub = window()
+    app.App.apply_config(stub, dict(CONFIG, player_icon_size=120, poll_interval=10, read_gap=1024))
+    assert stub.player_icon_size == 120
+    assert stub.images.calls == [("discard", (150, app.PORTRAIT_NAMES), {})]
+    assert [kwargs for _, _, kwargs in stub.renderer.calls] == [{"height": 125}] * 4
+    assert (stub.poller.interval, stub.poller.board_interval, stub.poller.idle_interval) == (0.01, 0.1, 0.5)
+    assert isinstance(stub.poller.planner, planner.ReadPlanner) and stub.poller.planner.gap == 1024
+    assert stub.view.player_icon_size == 120
+    assert stub.view.calls == [("invalidate", (), {})]
+    assert stub.scheduler.calls == [] and stub.home_frame.calls == []
+
+
+def test_stat_size_reloads_only_icons():
+    stub = window()
+    app.App.apply_config(stub, dict(CONFIG, stats_label_size=30, frame_interval=50))
+    assert stub.images.calls == [("discard", (28, app.ICON_NAMES), {})]
+    assert stub.scheduler.calls == [("every", ("refresh", 50, None), {})]
+    assert all(kwargs == {"font": ("Helvetica", 30)} for _, _, kwargs in stub.renderer.calls)
+
+
+def test_reloads_are_debounced(tmp_path, monkeypatch):
+    reloads = []
+    monkeypatch.setattr(app, "read_config", lambda: reloads.append(1) or dict(CONFIG))
+    owner = types.SimpleNamespace(config_updates=poller.LatestQueue())
+    handler = app.ConfigFileHandler(owner, delay=0.05)
+    event = types.SimpleNamespace(event_type="modified", src_path=str(tmp_path / "config.json"))
+    for _ in range(5):
+        handler.dispatch(event)
+    handler.dispatch(types.SimpleNamespace(event_type="modified", src_path=str(tmp_path / "other.json")))
+    assert owner.config_updates.get_latest(timeout=1) == CONFIG
+    handler.timer.join()
+    assert reloads == [1]
@@ -0,0 +1,83 @@
+import backends
+import connection
+import memory
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+class FlakyBackend(backends.FakeBackend):
+    """FakeBackend whose first failures hook() attempts fail, like Dolphin starting up."""
+
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+        self.attempts = 0
+
+    def hook(self):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            return False
+        return super().hook()
+
+
+def test_failed_hooks_back_off(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(connection, "time", clock)
+    backend = FlakyBackend(failures=10)
+    manager = connection.ConnectionManager(backend, min_backoff=0.5, max_backoff=2)
+    context = memory.ReadContext(backend)
+
+    delays = []
+    while backend.attempts < 5:
+        attempts = backend.attempts
+        assert manager.poll(context) is None
+        assert manager.state == connection.DETACHED
+        if backend.attempts == attempts:
+            clock.now += 0.25
+        else:
+            delays.append(manager.next_attempt - clock.now)
+    assert delays == [0.5, 1, 2, 2, 2]
+
+
+def test_attach_and_detect_the_game(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(connection, "time", clock)
+    backend = FlakyBackend(failures=1)
+    manager = connection.ConnectionManager(backend, min_backoff=0.5)
+    context = memory.ReadContext(backend)
+    assert manager.poll(context) is None
+    clock.now += 0.5
+
+    backend.write(backends.MEM1_ADDRESS, b"GP6E01")
+    assert manager.poll(context) == "GP6E01"
+    assert manager.state == connection.GAME_DETECTED
+    assert manager.backoff == 0.5
+
+    # The game ID is kept for the rest of the attach session without reading it again
+    calls = backend.calls
+    context.reset()
+    assert manager.poll(context) == "GP6E01"
+    assert backend.calls == calls
+
+    manager.read_failed()
+    assert manager.state == connection.DETACHED and manager.game_id is None
+    assert not backend.is_hooked()
+    assert manager.poll(context) is None  # Waits for the backoff before hooking again
+
+
+def test_unknown_games_stay_attached():
+    backend = backends.FakeBackend()
+    backend.write(backends.MEM1_ADDRESS, b"GALE01")
+    manager = connection.ConnectionManager(backend)
+    assert manager.poll(memory.ReadContext(backend)) == "GALE01"
+    assert manager.state == connection.ATTACHED
+    # Still polled, since a supported game can boot next
+    backend.write(backends.MEM1_ADDRESS, b"GMPE01")
+    assert manager.poll(memory.ReadContext(backend)) == "GMPE01"
+    assert manager.state == connection.GAME_DETECTED
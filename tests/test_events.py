@@ -0,0 +1,55 @@
+import events
+import memory
+import poller
+
+
+def snapshot(turn, players=None, board=True, time=0.0, game_id="GMPE01"):
+    return poller.Snapshot(time, "game detected", game_id, 89 if board else 1, board, turn, 20,
+                           ("mario", "luigi", "peach", "yoshi"), players if board else None)
+
+
+def players(stars=(0, 0, 0, 0), coins=(10, 10, 10, 10)):
+    return tuple(memory.EMPTY_STATS._replace(stars=s, coins=c) for s, c in zip(stars, coins))
+
+
+def observe(snapshots, **options):
+    log = events.EventLog()
+    engine = events.EventEngine([log], **options)
+    for item in snapshots:
+        engine.observe(item)
+    return [(event.type, event.player, event.value, event.delta) for event in log.events]
+
+
+def test_turns_stars_and_coins():
+    assert observe([
+        snapshot(1, players()),
+        snapshot(1, players(coins=(13, 10, 10, 10))),
+        snapshot(2, players(stars=(0, 1, 0, 0), coins=(13, 0, 10, 10))),
+    ]) == [
+        (events.TURN_START, None, 1, None),
+        (events.BOARD_ENTERED, None, 89, None),
+        (events.COIN_SWING, 0, 13, 3),
+        (events.TURN_START, None, 2, None),
+        (events.STAR_GAINED, 1, 1, 1),
+        (events.COIN_SWING, 1, 0, -10),
+    ]
+
+
+def test_coin_threshold_and_minigames():
+    found = observe([
+        snapshot(1, players()),
+        snapshot(1, board=False),
+        snapshot(1, players(coins=(11, 20, 10, 10))),
+    ], coin_threshold=5)
+    assert found == [
+        (events.TURN_START, None, 1, None),
+        (events.BOARD_ENTERED, None, 89, None),
+        (events.BOARD_LEFT, None, 1, None),
+        (events.BOARD_ENTERED, None, 89, None),
+        (events.COIN_SWING, 1, 20, 10),
+    ]
+
+
+def test_game_end_is_reported_once():
+    found = observe([snapshot(20, players()), snapshot(21, players()), snapshot(21, players())])
+    assert [event for event in found if event[0] == events.GAME_END] == [(events.GAME_END, None, 20, None)]
@@ -0,0 +1,37 @@
+import json
+import sys
+
+import pytest
+
+import benchmark
+import headless
+import layouts
+import planner
+import poller
+import recorder
+
+
+def test_without_a_console_output_is_required(monkeypatch):
+    # Like the windowed executable, which has no stdout
+    monkeypatch.setattr(sys, "stdout", None)
+    with pytest.raises(SystemExit) as exit_info:
+        headless.main([])
+    assert exit_info.value.code == 2
+
+
+def test_replay_to_a_file(tmp_path):
+    recording = str(tmp_path / "session.rec")
+    backend = benchmark.synthetic_backend("GP5E01")
+    memory_poller = poller.Poller(backend=recorder.Recorder(backend, recording), fields=planner.FIELDS)
+    for tick in range(30):
+        benchmark.simulate(backend, layouts.get_layout("GP5E01"), tick)
+        memory_poller.tick()
+    memory_poller.backend.close()
+
+    output = tmp_path / "snapshots.jsonl"
+    headless.main(["--replay", recording, "--speed", "0", "--output", str(output)])
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    # Coins change every third tick, and only changes are written
+    assert len(records) == 10
+    assert records[-1]["game_id"] == "GP5E01"
+    assert records[-1]["players"][3]["coins"] == 9
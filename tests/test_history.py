@@ -0,0 +1,41 @@
+import sqlite3
+
+import pytest
+
+import history
+import memory
+import poller
+
+
+def snapshot(turn, coins, board=True, time=0.0):
+    players = tuple(memory.EMPTY_STATS._replace(coins=coins + i) for i in range(4))
+    return poller.Snapshot(time, "game detected", "GP5E01", 118 if board else 1, board, turn, 3,
+                           ("mario", "luigi", "peach", "yoshi"), players if board else None)
+
+
+def test_records_sessions_turns_and_characters(tmp_path):
+    path = str(tmp_path / "data" / "history.sqlite3")
+    recorder = history.History(path)
+    recorder.start()
+    for item in [snapshot(1, 5, time=1), snapshot(1, 8, time=2), snapshot(1, 0, board=False, time=3),
+                 snapshot(2, 12, time=4), snapshot(3, 20, time=5), snapshot(4, 30, time=6)]:
+        recorder.observe(item)
+    recorder.close()
+
+    connection = sqlite3.connect(path)
+    try:
+        assert connection.execute("SELECT game_id, started, ended, final_turn FROM sessions").fetchall() == \
+            [("GP5E01", 1, 6, 3)]
+        # Each turn keeps the last stats seen on the board during it
+        assert connection.execute("SELECT turn, player, coins FROM player_stats WHERE player = 1 "
+                                  "ORDER BY turn").fetchall() == [(1, 1, 9), (2, 1, 13), (3, 1, 21)]
+        assert connection.execute("SELECT character FROM characters ORDER BY player").fetchall() == \
+            [("mario",), ("luigi",), ("peach",), ("yoshi",)]
+    finally:
+        connection.close()
+
+
+def test_unwritable_path_fails_right_away(tmp_path):
+    (tmp_path / "data").write_text("")
+    with pytest.raises(OSError):
+        history.History(str(tmp_path / "data" / "history.sqlite3"))
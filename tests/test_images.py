@@ -0,0 +1,50 @@
+import pytest
+
+import images
+
+
+class CountingCache(images.ImageCache):
+    """ImageCache that records loads instead of decoding PNGs into PhotoImages, which need a display."""
+
+    def __init__(self, max_entries=64):
+        super().__init__(max_entries)
+        self.loads = []
+
+    def load(self, folder, name, size):
+        self.loads.append((folder, name, size))
+        return (folder, name, size)
+
+
+def test_images_are_loaded_once_per_size():
+    cache = CountingCache()
+    assert cache.get("mp4", "mario", 150) == ("mp4", "mario", 150)
+    cache.get("mp4", "mario", 150)
+    cache.get("mp4", "mario", 100)
+    assert cache.loads == [("mp4", "mario", 150), ("mp4", "mario", 100)]
+
+
+def test_least_recently_used_is_evicted():
+    cache = CountingCache(max_entries=2)
+    cache.get("mp4", "mario", 150)
+    cache.get("mp4", "luigi", 150)
+    cache.get("mp4", "mario", 150)  # Now the most recently used
+    cache.get("mp4", "peach", 150)
+    assert list(cache.images) == [("mp4", "mario", 150), ("mp4", "peach", 150)]
+    cache.get("mp4", "luigi", 150)
+    assert cache.loads.count(("mp4", "luigi", 150)) == 2
+
+
+def test_discard_only_drops_the_given_names_at_size():
+    cache = CountingCache()
+    for name in ("mario", "luigi", "star"):
+        cache.get("mp4", name, 150)
+    cache.get("mp4", "mario", 28)
+    cache.discard(150, {"mario", "luigi"})
+    assert list(cache.images) == [("mp4", "star", 150), ("mp4", "mario", 28)]
+    cache.clear()
+    assert not cache.images
+
+
+def test_missing_assets_load_as_none():
+    pytest.importorskip("PIL")
+    assert images.ImageCache().load("mp4", "no such asset", 150) is None
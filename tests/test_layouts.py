@@ -0,0 +1,119 @@
+import pytest
+
+import benchmark
+import layouts
+import memory
+import planner
+import poller
+
+# The addresses the per-stat getters of the original App read, as (address per player, width)
+GETTER_STATS = {
+    "stars": ({
+        "GMPE01": [0x8018FC62, 0x8018FC92, 0x8018FCC2, 0x8018FCF2],
+        "GMPEDX": [0x8018FC62, 0x8018FC92, 0x8018FCC2, 0x8018FCF2],
+        "GP5E01": [0x8022A0A4, 0x8022A1AC, 0x8022A2B4, 0x8022A3BC],
+        "GP6E01": [0x80265780, 0x80265888, 0x80265990, 0x80265A98],
+        "GP7E01": [0x80290CD0, 0x80290DE0, 0x80290EF0, 0x80291000],
+        "RM8E01": [0x80228390, 0x802283A9, 0x802283B3, 0x802283BD]
+    }, 2),
+    "coins": ({
+        "GMPE01": [0x8018FC54, 0x8018FC84, 0x8018FCB4, 0x8018FCE4],
+        "GMPEDX": [0x8018FC54, 0x8018FC84, 0x8018FCB4, 0x8018FCE4],
+        "GP5E01": [0x8022A090, 0x8022A198, 0x8022A2A0, 0x8022A3A8],
+        "GP6E01": [0x8026576C, 0x80265874, 0x8026597C, 0x80265A84],
+        "GP7E01": [0x80290CBE, 0x80290DCE, 0x80290EDE, 0x80290FEE],
+        "RM8E01": [0x8022831E, 0x80228436, 0x8022854E, 0x80228666]
+    }, 2),
+    "mg": ({
+        "GMPE01": [0x8018FC56, 0x8018FC86, 0x8018FCB6, 0x8018FCE6],
+        "GMPEDX": [0x8018FC56, 0x8018FC86, 0x8018FCB6, 0x8018FCE6],
+        "GP5E01": [0x8022A092, 0x8022A19A, 0x8022A2A2, 0x8022A3AA],
+        "GP6E01": [0x8026576E, 0x80265876, 0x8026597E, 0x80265A86],
+        "GP7E01": [0x80290CC0, 0x80290DD0, 0x80290EE0, 0x80290FF0]
+    }, 2),
+    "coinStar": ({
+        "GMPE01": [0x8018FC5A, 0x8018FC8A, 0x8018FCBA, 0x8018FCEA],
+        "GMPEDX": [0x8018FC5A, 0x8018FC8A, 0x8018FCBA, 0x8018FCEA],
+        "GP5E01": [0x8022A096, 0x8022A19E, 0x8022A2A6, 0x8022A3AE],
+        "GP6E01": [0x80265784, 0x8026588C, 0x80265994, 0x80265A9C],
+        "GP7E01": [0x80290CD4, 0x80290DE4, 0x80290EF4, 0x80291004]
+    }, 2),
+    "happening": ({
+        "GMPE01": [0x8018FC4E, 0x8018FC7E, 0x8018FCAE, 0x8018FCDE],
+        "GMPEDX": [0x8018FC4E, 0x8018FC7E, 0x8018FCAE, 0x8018FCDE],
+        "GP5E01": [0x8022A087, 0x8022A18F, 0x8022A297, 0x8022A39F],
+        "GP6E01": [0x80265767, 0x8026586E, 0x80265977, 0x80265A7E],
+        "GP7E01": [0x80290CB7, 0x80290DC7, 0x80290ED7, 0x80290FE7]
+    }, 1),
+    "running": ({"GP7E01": [0x80290CB0, 0x80290DC0, 0x80290ED0, 0x80290FE0]}, 2),
+    "shopping": ({"GP7E01": [0x80290CD6, 0x80290DE6, 0x80290EF6, 0x80291006]}, 2),
+    "red": ({"GP7E01": [0x80290CB5, 0x80290DC5, 0x80290ED5, 0x80290FE5]}, 1)
+}
+
+# (current turn, final turn, scene, characters of each player) as the original getters read them
+GETTER_BYTES = {
+    "GMPE01": (0x8018FCFC, 0x8018FCFD, 0x801D3CE3, [0x8018FC11, 0x8018FC1B, 0x8018FC25, 0x8018FC2F]),
+    "GMPEDX": (0x8018FCFC, 0x8018FCFD, 0x801D3CE3, [0x8018FC11, 0x8018FC1B, 0x8018FC25, 0x8018FC2F]),
+    "GP5E01": (0x8022A494, 0x8022A495, 0x80288863, [0x8022A049, 0x8022A053, 0x8022A05D, 0x8022A067]),
+    "GP6E01": (0x80265B74, 0x80265B75, 0x802C0257, [0x80265729, 0x80265733, 0x8026573D, 0x80265747]),
+    "GP7E01": (0x8029151C, 0x8029151D, 0x802F2F3F, [0x80290C49, 0x80290C53, 0x80290C5D, 0x80290C67]),
+    "RM8E01": (0x80228764, 0x80228765, 0x802CD223, [0x802282D1, 0x802282DB, 0x802282E5, 0x802282EF])
+}
+
+
+def getter_stats(game_id):
+    return {(i, field): (address, width)
+            for field, (games, width) in GETTER_STATS.items() if game_id in games
+            for i, address in enumerate(games[game_id])}
+
+
+@pytest.mark.parametrize("game_id", sorted(GETTER_BYTES))
+def test_stat_addresses_match_the_original_getters(game_id):
+    assert dict(layouts.get_layout(game_id).stat_addresses) == getter_stats(game_id)
+
+
+@pytest.mark.parametrize("game_id", sorted(GETTER_BYTES))
+def test_byte_addresses_match_the_original_getters(game_id):
+    layout = layouts.get_layout(game_id)
+    turn, final_turn, scene, characters = GETTER_BYTES[game_id]
+    assert (layout.turn[0], layout.final_turn[0], layout.scene[0]) == (turn, final_turn, scene)
+    assert [layout.data.characters + i * layout.data.character_stride for i in range(4)] == characters
+
+
+@pytest.mark.parametrize("game_id", sorted(GETTER_BYTES))
+def test_poll_decodes_what_the_original_getters_read(game_id):
+    layout = layouts.get_layout(game_id)
+    backend = benchmark.synthetic_backend(game_id)
+    expected = {}
+    for n, ((i, field), (address, width)) in enumerate(sorted(getter_stats(game_id).items())):
+        benchmark.write_value(backend, address, width, 100 + n)
+        expected[i, field] = 100 + n
+    turn, final_turn, _, characters = GETTER_BYTES[game_id]
+    benchmark.write_value(backend, turn, 1, 7)
+    benchmark.write_value(backend, final_turn, 1, 30)
+    for i, address in enumerate(characters):
+        benchmark.write_value(backend, address, 1, 3 - i)
+
+    snapshot = poller.Poller(backend=backend, fields=planner.FIELDS).tick()
+    assert snapshot.game_id == game_id
+    assert snapshot.board
+    assert (snapshot.current_turn, snapshot.final_turn) == (7, 30)
+    assert snapshot.characters == tuple(layout.character_name(3 - i) for i in range(4))
+    for i, stats in enumerate(snapshot.players):
+        for field in layouts.STAT_FIELDS:
+            assert getattr(stats, field) == expected.get((i, field), 0)
+
+
+def test_unchanged_stats_are_the_same_objects():
+    backend = benchmark.synthetic_backend("GP7E01")
+    memory_poller = poller.Poller(backend=backend, fields=planner.FIELDS)
+    first, second = memory_poller.tick(), memory_poller.tick()
+    assert first.players is second.players
+    assert first.characters is second.characters
+    address, width = layouts.get_layout("GP7E01").stat_addresses[2, "coins"]
+    benchmark.write_value(backend, address, width, 55)
+    third = memory_poller.tick()
+    assert third.players[2].coins == 55
+    assert third.players[:2] == first.players[:2]
+    assert not poller.same_state(first, third)
+    assert memory.get_reader("GP7E01").read_player_stats(2, memory.ReadContext(backend)).coins == 55
@@ -0,0 +1,60 @@
+import json
+import os
+
+import output
+
+
+def read(directory, name):
+    with open(os.path.join(directory, name)) as f:
+        return f.read()
+
+
+def test_only_changed_fields_are_written(tmp_path):
+    writer = output.OverlayWriter(str(tmp_path))
+    assert writer.update({"turn": "Turn: 1 / 20", "player1_coins": 10})
+    writer.flush()
+    assert read(tmp_path, "turn.txt") == "Turn: 1 / 20\n"
+    assert read(tmp_path, "player1_coins.txt") == "10\n"
+
+    assert not writer.update({"turn": "Turn: 1 / 20", "player1_coins": 10})
+    assert writer.update({"turn": "Turn: 1 / 20", "player1_coins": 13})
+    assert writer.pending == {"player1_coins": 13}
+    # Changing back before the flush leaves nothing to write
+    assert not writer.update({"player1_coins": 10})
+    writer.flush()
+    assert read(tmp_path, "player1_coins.txt") == "10\n"
+
+
+def test_state_file(tmp_path):
+    writer = output.OverlayWriter(str(tmp_path), state_file="state.json")
+    writer.update({"turn": "Turn: 1 / 20", "player1_coins": 10})
+    writer.flush()
+    writer.update({"player1_coins": 12})
+    writer.flush()
+    assert json.loads(read(tmp_path, "state.json")) == {"turn": "Turn: 1 / 20", "player1_coins": 12}
+
+
+def test_writes_are_atomic(tmp_path, monkeypatch):
+    path = str(tmp_path / "turn.txt")
+    assert output.write_atomic(path, "old\n")
+
+    def fail(source, destination):
+        raise PermissionError("held open by another program")
+
+    monkeypatch.setattr(os, "replace", fail)
+    assert not output.write_atomic(path, "new\n")
+    # The old file is untouched and no temporary file is left behind
+    assert os.listdir(tmp_path) == ["turn.txt"]
+    assert read(tmp_path, "turn.txt") == "old\n"
+
+
+def test_failed_files_are_retried(tmp_path, monkeypatch):
+    writer = output.OverlayWriter(str(tmp_path))
+    writer.update({"turn": "Turn: 2 / 20"})
+    monkeypatch.setattr(output, "write_atomic", lambda path, text: False)
+    writer.flush()
+    assert writer.pending == {"turn": "Turn: 2 / 20"}
+    monkeypatch.undo()
+    writer.flush()
+    assert not writer.pending
+    assert read(tmp_path, "turn.txt") == "Turn: 2 / 20\n"
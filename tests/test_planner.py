@@ -0,0 +1,47 @@
+import struct
+
+import layouts
+import planner
+
+BYTE = struct.Struct(">B")
+WORD = struct.Struct(">H")
+
+
+def test_merge_joins_decoders_within_the_gap():
+    a, b, c = (0x100, WORD), (0x104, BYTE), (0x400, BYTE)
+    spans = planner.merge([c, a, b, a], gap=16)
+    assert [(span.address, span.size) for span in spans] == [(0x100, 5), (0x400, 1)]
+    assert spans[0].members == ((a, 0), (b, 4))
+    assert all(len(span.buffer) == span.size for span in spans)
+
+
+def test_merge_splits_decoders_beyond_the_gap():
+    spans = planner.merge([(0x100, WORD), (0x104, BYTE)], gap=1)
+    assert [(span.address, span.size) for span in spans] == [(0x100, 2), (0x104, 1)]
+
+
+def test_plans_cover_every_field_and_are_cached():
+    read_planner = planner.ReadPlanner()
+    for layout in layouts.LAYOUTS.values():
+        plan = read_planner.plan(layout, planner.FIELDS)
+        covered = {decoder for span in plan for decoder, _ in span.members}
+        assert covered == set(planner.layout_decoders(layout).values())
+        assert read_planner.plan(layout, planner.FIELDS) is plan
+
+
+def test_polls_read_only_what_consumers_declare():
+    import benchmark
+    import events
+    import poller
+
+    backend = benchmark.synthetic_backend("GMPE01")
+    memory_poller = poller.Poller(backend=backend)
+    assert memory_poller.board_fields == {"scene"}
+    engine = events.EventEngine()
+    memory_poller.listen(engine.observe, engine.fields)
+    memory_poller.tick()
+    snapshot = memory_poller.tick()
+    assert snapshot.current_turn == 1 and snapshot.players is not None
+    assert snapshot.characters == ()
+    memory_poller.require(planner.FIELDS)
+    assert len(memory_poller.tick().characters) == 4
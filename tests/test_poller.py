@@ -0,0 +1,63 @@
+import pytest
+
+import backends
+import memory
+import poller
+
+PLAYERS = tuple(memory.EMPTY_STATS for _ in range(4))
+BOARD = poller.Snapshot(0.0, "game detected", "GMPE01", 89, True, 1, 20, ("mario", "luigi", "peach", "yoshi"), PLAYERS)
+MENU = BOARD._replace(scene_id=1, board=False, players=None)
+
+
+def delays(memory_poller, snapshots):
+    return [round(memory_poller.adapt(snapshot._replace(time=float(i))), 4) for i, snapshot in enumerate(snapshots)]
+
+
+def test_unchanged_polls_back_off_to_the_scene_cap():
+    memory_poller = poller.Poller(0.02, backends.FakeBackend(), board_interval=0.1, idle_interval=0.5)
+    assert delays(memory_poller, [BOARD] * 7) == [0.02, 0.03, 0.045, 0.0675, 0.1, 0.1, 0.1]
+    assert delays(memory_poller, [MENU] + [MENU] * 9)[-3:] == [0.3417, 0.5, 0.5]
+
+
+def test_any_change_snaps_back():
+    memory_poller = poller.Poller(0.02, backends.FakeBackend(), board_interval=0.1, idle_interval=0.5)
+    delays(memory_poller, [BOARD] * 5)
+    coins = (PLAYERS[0]._replace(coins=3),) + PLAYERS[1:]
+    assert delays(memory_poller, [BOARD._replace(players=coins)]) == [0.02]
+    assert delays(memory_poller, [BOARD._replace(players=coins, current_turn=2)]) == [0.02]
+
+
+def test_caps_are_never_below_the_interval():
+    memory_poller = poller.Poller(0.2, backends.FakeBackend(), board_interval=0.1, idle_interval=0.1)
+    assert delays(memory_poller, [BOARD] * 3) == [0.2, 0.2, 0.2]
+
+
+def test_frame_driven_backends_never_back_off():
+    backend = backends.FakeBackend()
+    backend.frame_driven = True
+    memory_poller = poller.Poller(0.02, backend)
+    assert delays(memory_poller, [MENU] * 5) == [0.02] * 5
+
+
+def test_failing_listeners_dont_stop_polling(capsys):
+    memory_poller = poller.Poller(0.02, backends.FakeBackend())
+    seen = []
+
+    def broken(snapshot):
+        raise ValueError("broken listener")
+
+    memory_poller.listen(broken)
+    memory_poller.listen(seen.append)
+    memory_poller.notify(BOARD)
+    memory_poller.notify(BOARD)
+    assert seen == [BOARD, BOARD]
+    assert capsys.readouterr().out.count("failed") == 1
+
+
+@pytest.mark.parametrize("other, same", [
+    (BOARD._replace(time=5.0), True),
+    (BOARD._replace(scene_id=90), False),
+    (None, False),
+])
+def test_same_state_ignores_time(other, same):
+    assert poller.same_state(BOARD, other) is same
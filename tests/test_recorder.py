@@ -0,0 +1,81 @@
+import benchmark
+import layouts
+import planner
+import poller
+import recorder
+
+
+def test_diff_runs():
+    old = bytes(24)
+    assert recorder.diff_runs(old, old) == []
+    new = bytearray(old)
+    new[2] = 1
+    new[4] = 2  # Close enough to the first change to share its run
+    new[20] = 3
+    assert recorder.diff_runs(old, bytes(new)) == [(2, bytes([1, 0, 2])), (20, bytes([3]))]
+    assert recorder.diff_runs(old, bytes(new), min_gap=1) == [(2, b"\1"), (4, b"\2"), (20, b"\3")]
+
+
+def record(path, game_id="GMPE01", frames=120):
+    backend = benchmark.synthetic_backend(game_id)
+    recording = recorder.Recorder(backend, path)
+    memory_poller = poller.Poller(backend=recording, fields=planner.FIELDS)
+    snapshots = []
+    for tick in range(frames):
+        benchmark.simulate(backend, layouts.get_layout(game_id), tick)
+        snapshots.append(memory_poller.tick())
+    recording.close()
+    return snapshots
+
+
+def test_replay_reproduces_every_recorded_snapshot(tmp_path):
+    path = str(tmp_path / "session.rec")
+    recorded = record(path)
+    backend = recorder.Replayer(path, speed=None)
+    memory_poller = poller.Poller(backend=backend, fields=planner.FIELDS)
+    replayed = []
+    while not backend.finished:
+        replayed.append(memory_poller.tick())
+    assert len(replayed) == len(recorded)
+    for before, after in zip(recorded, replayed):
+        assert poller.same_state(before, after)
+
+
+def test_frames_only_hold_changes(tmp_path):
+    path = str(tmp_path / "session.rec")
+    record(path, frames=10)
+    frames = list(recorder.read_frames(path))
+    assert len(frames) == 10
+    # Only the first frame holds the regions in full; later ones carry the coins that changed, if any
+    first_size = sum(len(data) for _, runs in frames[0][1] for _, data in runs)
+    assert all(sum(len(data) for _, runs in regions for _, data in runs) < first_size for _, regions in frames[1:])
+
+
+def test_fast_replay_ends_the_poller(tmp_path):
+    path = str(tmp_path / "session.rec")
+    record(path, frames=50)
+    backend = recorder.Replayer(path, speed=None)
+    memory_poller = poller.Poller(backend=backend)
+    snapshots = []
+    memory_poller.listen(snapshots.append)
+    memory_poller.start()
+    memory_poller.join(5)
+    assert not memory_poller.is_alive()
+    assert len(snapshots) == 50
+
+
+def test_spans_larger_than_64_kib(tmp_path):
+    path = str(tmp_path / "session.rec")
+    backend = benchmark.synthetic_backend("RM8E01")
+    recording = recorder.Recorder(backend, path)
+    memory_poller = poller.Poller(backend=recording, fields=planner.FIELDS, read_gap=1 << 20)
+    assert max(span.size for span in memory_poller.planner.plan(layouts.get_layout("RM8E01"), planner.FIELDS)) > 0xFFFF
+    recorded = [memory_poller.tick()]
+    benchmark.write_value(backend, layouts.get_layout("RM8E01").data.scene, 1, 0)
+    recorded.append(memory_poller.tick())
+    recording.close()
+
+    backend = recorder.Replayer(path, speed=None)
+    memory_poller = poller.Poller(backend=backend, fields=planner.FIELDS)
+    for snapshot in recorded:
+        assert poller.same_state(memory_poller.tick(), snapshot)
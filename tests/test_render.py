@@ -0,0 +1,85 @@
+from collections import defaultdict
+
+import benchmark
+import memory
+import poller
+import render
+
+
+class Widget:
+    def __init__(self):
+        self.calls = []
+
+    def configure(self, **options):
+        self.calls.append(("configure", options))
+
+    def grid(self, **options):
+        self.calls.append(("grid", options))
+
+    def grid_forget(self):
+        self.calls.append(("grid_forget", {}))
+
+
+def test_configure_skips_unchanged_options():
+    renderer = render.Renderer()
+    widget = Widget()
+    assert renderer.configure(widget, text="Turn 1", pady=10)
+    assert not renderer.configure(widget, text="Turn 1", pady=10)
+    assert renderer.configure(widget, text="Turn 2", pady=10)
+    assert widget.calls == [("configure", {"text": "Turn 1", "pady": 10}), ("configure", {"text": "Turn 2"})]
+
+
+def test_configure_keeps_a_reference_to_images():
+    renderer = render.Renderer()
+    widget = Widget()
+    image = object()
+    renderer.configure(widget, image=image)
+    assert widget.image is image
+    # None is a value of its own, not a missing option
+    assert renderer.configure(widget, image=None)
+    assert widget.image is None
+
+
+def test_grid_only_on_visibility_changes():
+    renderer = render.Renderer()
+    widget = Widget()
+    renderer.grid(widget, row=1)
+    renderer.grid(widget, row=1)
+    renderer.grid_forget(widget)
+    renderer.grid_forget(widget)
+    renderer.grid(widget, row=1)
+    assert [name for name, _ in widget.calls] == ["grid", "grid_forget", "grid"]
+
+
+def test_forget_touches_the_widget_again():
+    renderer = render.Renderer()
+    widget = Widget()
+    renderer.configure(widget, text="a")
+    renderer.grid(widget, row=0)
+    renderer.forget(widget)
+    renderer.configure(widget, text="a")
+    renderer.grid(widget, row=0)
+    assert [name for name, _ in widget.calls] == ["configure", "grid", "configure", "grid"]
+
+
+def test_view_only_renders_what_changed():
+    counter = defaultdict(int)
+    overlay = []
+    view = render.SnapshotView(render.Renderer(), benchmark.CountingImageCache(counter),
+                               benchmark.NullWidget(counter), [benchmark.NullWidget(counter) for _ in range(4)],
+                               [benchmark.NullWidget(counter) for _ in range(4)],
+                               lambda field: [benchmark.NullWidget(counter) for _ in range(4)], overlay.append)
+    players = tuple(memory.EMPTY_STATS._replace(coins=10) for _ in range(4))
+    snapshot = poller.Snapshot(1.0, "game detected", "GMPE01", 89, True, 1, 20, ("mario", "luigi", "peach", "yoshi"),
+                               players)
+    assert view.render(snapshot)
+    assert counter["widget_updates"] > 0
+
+    counter.clear()
+    assert not view.render(snapshot._replace(time=2.0))
+    assert counter["widget_updates"] == 0
+
+    players = (players[0]._replace(coins=13),) + players[1:]
+    assert view.render(snapshot._replace(time=3.0, players=players))
+    # The one coin label, and no portrait or icon is loaded again
+    assert dict(counter) == {"widget_updates": 1}
@@ -0,0 +1,99 @@
+import pytest
+
+import scheduler
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+class Widget:
+    """Stand-in for a Tk widget's after() and after_cancel(), driven by run_due()."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.pending = {}
+        self.next_id = 0
+        self.delays = []
+
+    def after(self, delay, callback, *args):
+        self.next_id += 1
+        self.pending[self.next_id] = (self.clock.now + delay / 1000, callback, args)
+        self.delays.append(delay)
+        return self.next_id
+
+    def after_cancel(self, after_id):
+        del self.pending[after_id]
+
+    def advance(self):
+        """Move the clock to the earliest pending call and run what is due then."""
+        self.clock.now = min(due for due, _, _ in self.pending.values())
+        self.run_due()
+
+    def run_due(self):
+        for after_id, (due, callback, args) in sorted(self.pending.items(), key=lambda item: item[1][0]):
+            if due <= self.clock.now + 1e-9 and after_id in self.pending:
+                del self.pending[after_id]
+                callback(*args)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(scheduler, "time", clock)
+    return clock
+
+
+def test_one_pending_call_per_name(clock):
+    widget = Widget(clock)
+    jobs = scheduler.Scheduler(widget)
+    calls = []
+    jobs.once("flush", 100, lambda: calls.append("first"))
+    jobs.once("flush", 100, lambda: calls.append("second"))
+    assert len(widget.pending) == 1 and jobs.is_pending("flush")
+    clock.now += 0.1
+    widget.run_due()
+    assert calls == ["second"]
+    assert not jobs.is_pending("flush")
+
+
+def test_periodic_jobs_keep_their_cadence(clock):
+    widget = Widget(clock)
+    jobs = scheduler.Scheduler(widget)
+    runs = []
+
+    def refresh():
+        runs.append(round(clock.now, 3))
+        clock.now += 0.005  # Time spent in the callback doesn't push the next deadline back
+
+    jobs.every("refresh", 20, refresh)
+    for _ in range(3):
+        widget.advance()
+    assert runs == [100.02, 100.04, 100.06]
+    assert widget.delays == [20, 15, 15, 15]
+
+    # A stall skips the ticks that were missed instead of running them all at once
+    clock.now += 0.1
+    widget.run_due()
+    assert len(runs) == 4 and len(widget.pending) == 1
+    widget.advance()
+    assert runs[-1] == 100.18
+
+
+def test_callbacks_can_reschedule_or_cancel_themselves(clock):
+    widget = Widget(clock)
+    jobs = scheduler.Scheduler(widget)
+    jobs.every("retry", 20, lambda: jobs.once("retry", 500, lambda: None))
+    clock.now += 0.02
+    widget.run_due()
+    assert widget.delays[-1] == 500
+    jobs.every("stop", 20, lambda: jobs.cancel("stop"))
+    clock.now += 0.02
+    widget.run_due()
+    assert not jobs.is_pending("stop")
+    jobs.cancel_all()
+    assert not widget.pending
@@ -0,0 +1,117 @@
+import base64
+import json
+import os
+import socket
+import struct
+
+import pytest
+
+import events
+import memory
+import poller
+import server
+
+PLAYERS = tuple(memory.EMPTY_STATS._replace(coins=10 * i) for i in range(4))
+BOARD = poller.Snapshot(1.0, "game detected", "GMPE01", 89, True, 3, 20, ("mario", "luigi", "peach", "yoshi"), PLAYERS)
+
+
+@pytest.fixture
+def snapshot_server():
+    snapshot_server = server.SnapshotServer(port=0)
+    snapshot_server.start()
+    snapshot_server.ready.wait(5)
+    yield snapshot_server
+    snapshot_server.stop()
+    snapshot_server.join(5)
+
+
+class Client:
+    """Minimal WebSocket client reading the server's unmasked text frames."""
+
+    def __init__(self, port):
+        self.socket = socket.create_connection(("127.0.0.1", port), timeout=5)
+        key = base64.b64encode(os.urandom(16)).decode("ascii")
+        self.socket.sendall((f"GET /ws HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                             f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n").encode("latin-1"))
+        self.buffer = b""
+        response = self.read_until(b"\r\n\r\n")
+        assert response.startswith(b"HTTP/1.1 101")
+
+    def read_exactly(self, size):
+        while len(self.buffer) < size:
+            data = self.socket.recv(4096)
+            assert data, "connection closed"
+            self.buffer += data
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+    def read_until(self, separator):
+        while separator not in self.buffer:
+            data = self.socket.recv(4096)
+            assert data, "connection closed"
+            self.buffer += data
+        data, _, self.buffer = self.buffer.partition(separator)
+        return data
+
+    def receive(self):
+        head = self.read_exactly(2)
+        length = head[1] & 0x7F
+        if length == 126:
+            length = struct.unpack(">H", self.read_exactly(2))[0]
+        elif length == 127:
+            length = struct.unpack(">Q", self.read_exactly(8))[0]
+        return json.loads(self.read_exactly(length))
+
+    def close(self):
+        self.socket.close()
+
+
+def http_get(port, path):
+    with socket.create_connection(("127.0.0.1", port), timeout=5) as connection:
+        connection.sendall(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode("latin-1"))
+        response = b""
+        while data := connection.recv(4096):
+            response += data
+    head, _, body = response.partition(b"\r\n\r\n")
+    return head.split(b"\r\n", 1)[0].decode("latin-1"), body
+
+
+def test_http_snapshot(snapshot_server):
+    assert http_get(snapshot_server.port, "/snapshot") == ("HTTP/1.1 200 OK", b'{"type": "snapshot", "time": null, '
+                                                                             b'"fields": {}}')
+    assert http_get(snapshot_server.port, "/missing")[0] == "HTTP/1.1 404 Not Found"
+
+
+def test_websocket_patches_hold_only_changes(snapshot_server):
+    client = Client(snapshot_server.port)
+    try:
+        assert client.receive() == {"type": "snapshot", "time": None, "fields": {}}
+        snapshot_server.publish(BOARD)
+        first = client.receive()
+        assert first["type"] == "patch"
+        assert first["fields"] == server.snapshot_fields(BOARD)
+
+        # Only the time changed, so nothing is sent for this one
+        snapshot_server.publish(BOARD._replace(time=2.0))
+        players = (PLAYERS[0]._replace(coins=99),) + PLAYERS[1:]
+        snapshot_server.publish(BOARD._replace(time=3.0, players=players))
+        assert client.receive() == {"type": "patch", "time": 3.0, "fields": {"player1_coins": 99}}
+
+        # Leaving the board drops the stats, which clients see as null
+        snapshot_server.publish(BOARD._replace(time=4.0, board=False, scene_id=1, players=None))
+        patch = client.receive()
+        assert patch["fields"]["board"] is False
+        assert patch["fields"]["player2_coins"] is None
+    finally:
+        client.close()
+
+
+def test_events_are_told_apart_from_patches(snapshot_server):
+    client = Client(snapshot_server.port)
+    try:
+        client.receive()
+        snapshot_server.publish_event(events.Event(events.COIN_SWING, 1.0, "GMPE01", 3, 1, 20, 10))
+        assert client.receive() == {"type": "event", "event": {
+            "type": "coin swing", "time": 1.0, "game_id": "GMPE01", "turn": 3, "player": 1, "value": 20, "delta": 10}}
+    finally:
+        client.close()
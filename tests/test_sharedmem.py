@@ -0,0 +1,35 @@
+import memory
+import poller
+import sharedmem
+
+PLAYERS = tuple(memory.PlayerStats(*range(i * 10, i * 10 + len(memory.STAT_FIELDS))) for i in range(4))
+BOARD = poller.Snapshot(1.5, "game detected", "GP7E01", 122, True, 3, 20, ("mario", "luigi", "boo", "toad"), PLAYERS)
+DETACHED = poller.Snapshot(2.0, "detached", None, 0, False, 0, 20, (), None)
+
+
+def test_encode_decode_round_trip():
+    for snapshot in (BOARD, DETACHED, BOARD._replace(game_id="", players=None, characters=("mario",))):
+        assert sharedmem.decode(sharedmem.PAYLOAD.unpack(sharedmem.PAYLOAD.pack(*sharedmem.encode(snapshot)))) \
+            == snapshot
+
+
+def test_reader_follows_the_publisher(tmp_path):
+    path = str(tmp_path / "snapshot.shm")
+    publisher = sharedmem.SnapshotPublisher(path)
+    with sharedmem.SnapshotReader(path) as reader:
+        assert reader.read() == (0, None)
+        publisher.publish(BOARD)
+        version, snapshot = reader.read()
+        assert snapshot == BOARD and version % 2 == 0
+        # Only the time changed, so nothing is published
+        publisher.publish(BOARD._replace(time=3.0))
+        assert reader.version() == version
+        assert reader.wait(version, timeout=0) is None
+        publisher.close()
+        version, snapshot = reader.wait(version, timeout=1)
+        assert snapshot.connection == "detached" and snapshot.game_id is None
+
+    # A new publisher continues the version, so readers see its first update as new
+    publisher = sharedmem.SnapshotPublisher(path)
+    assert publisher.version == version
+    publisher.close()